@@ -6,12 +6,30 @@ CSC数据处理器模块
 """
 
 import os
+import numpy as np
 import pandas as pd
+from pandas.api.types import union_categoricals
 from typing import List, Dict, Optional, Tuple, Any
 import logging
 import re
 from alias_processor import AliasProcessor
 
+# 文本列的字符串类型：安装了pyarrow时使用Arrow存储，.str操作由Arrow的C++内核执行，内存占用更小
+# 同时使用pyarrow的多线程CSV解析引擎，否则回退到pandas的C引擎
+try:
+    import pyarrow  # noqa: F401
+    _STRING_DTYPE = 'string[pyarrow]'
+    _CSV_ENGINE = 'pyarrow'
+except ImportError:
+    _STRING_DTYPE = 'string'
+    _CSV_ENGINE = 'c'
+
+# Wikidata ID格式: Q + 数字
+_WIKI_RE = re.compile(r'^Q\d+$')
+
+# 连续空白字符
+_WS_RE = re.compile(r'\s+')
+
 class CSCProcessor:
     """
     CSC数据处理器
@@ -28,6 +46,12 @@ class CSCProcessor:
     # 必填字段
     REQUIRED_FIELDS = ['id', 'name', 'country_code', 'wikiDataId']
     
+    # 低基数代码字段，加载时转换为分类类型
+    CATEGORICAL_FIELDS = ['country_code', 'state_code']
+    
+    # 分块读取时每块的记录数
+    LOAD_CHUNK_SIZE = 200_000
+    
     def __init__(self, file_path: str = 'source_data/csc/cities.txt'):
         """
         初始化CSC处理器
@@ -41,6 +65,9 @@ class CSCProcessor:
         self.validation_errors = []
         self.alias_processor = AliasProcessor()
         
+        # 最近一次提取的wikiDataId结果缓存：(DataFrame, wikiDataId列表)，按DataFrame对象身份命中
+        self._wikidata_ids_cache: Optional[Tuple[pd.DataFrame, List[str]]] = None
+        
         # 验证文件路径
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"CSC数据文件不存在: {file_path}")
@@ -64,36 +91,57 @@ class CSCProcessor:
         try:
             self.logger.info(f"开始加载CSC数据文件: {target_file}")
             
-            # 读取CSV文件
-            df = pd.read_csv(
-                target_file,
+            # 先只读取表头验证字段名
+            expected_columns = set(self.FIELD_NAMES)
+            actual_columns = set(pd.read_csv(target_file, encoding='utf-8', nrows=0).columns)
+            
+            if expected_columns != actual_columns:
+                missing = expected_columns - actual_columns
+                extra = actual_columns - expected_columns
+                error_msg = f"字段不匹配 - 缺失: {missing}, 多余: {extra}"
+                raise ValueError(error_msg)
+            
+            read_options = dict(
                 encoding='utf-8',
+                usecols=self.FIELD_NAMES,
                 dtype={
                     'id': 'int64',
-                    'name': 'string',
+                    'name': _STRING_DTYPE,
                     'state_id': 'Int64',  # 可空整数
-                    'state_code': 'string',
-                    'state_name': 'string',
+                    'state_code': _STRING_DTYPE,
+                    'state_name': _STRING_DTYPE,
                     'country_id': 'Int64',
-                    'country_code': 'string',
-                    'country_name': 'string',
+                    'country_code': _STRING_DTYPE,
+                    'country_name': _STRING_DTYPE,
                     'latitude': 'float64',
                     'longitude': 'float64',
-                    'wikiDataId': 'string'
+                    'wikiDataId': _STRING_DTYPE
                 },
                 na_values=['NULL', 'null'],
                 keep_default_na=False
             )
             
-            # 验证字段名
-            expected_columns = set(self.FIELD_NAMES)
-            actual_columns = set(df.columns)
-            
-            if expected_columns != actual_columns:
-                missing = expected_columns - actual_columns
-                extra = actual_columns - expected_columns
-                error_msg = f"字段不匹配 - 缺失: {missing}, 多余: {extra}"
-                raise ValueError(error_msg)
+            if _CSV_ENGINE == 'pyarrow':
+                # pyarrow引擎不支持分块读取，直接整体读取（Arrow缓冲区本身已较紧凑）
+                df = pd.read_csv(target_file, engine='pyarrow', **read_options)
+                
+                # pyarrow引擎的na_values对字符串列不生效，与C引擎保持一致，手动将NULL文本转为缺失值
+                for field, dtype in read_options['dtype'].items():
+                    if dtype == _STRING_DTYPE:
+                        df[field] = df[field].mask(df[field].isin(read_options['na_values']))
+                
+                # 低基数代码字段转换为分类类型
+                for field in self.CATEGORICAL_FIELDS:
+                    df[field] = df[field].astype('category')
+            else:
+                # 分块读取，每块的代码字段先转换为分类类型，峰值内存限制在单块原始数据加最终结果
+                chunks = []
+                for chunk in pd.read_csv(target_file, engine='c', chunksize=self.LOAD_CHUNK_SIZE, **read_options):
+                    for field in self.CATEGORICAL_FIELDS:
+                        chunk[field] = chunk[field].astype('category')
+                    chunks.append(chunk)
+                
+                df = self._concat_categorical_chunks(chunks)
             
             self.logger.info(f"成功加载CSC数据: {len(df)} 条记录")
             return df
@@ -102,6 +150,24 @@ class CSCProcessor:
             self.logger.error(f"加载CSC数据失败: {str(e)}")
             raise
     
+    def _concat_categorical_chunks(self, chunks: List[pd.DataFrame]) -> pd.DataFrame:
+        """
+        合并分块读取的数据，统一各块分类字段的类别后再拼接，保证结果仍为分类类型
+        
+        Args:
+            chunks: 分块读取的DataFrame列表
+            
+        Returns:
+            pd.DataFrame: 合并后的数据
+        """
+        if len(chunks) > 1:
+            for field in self.CATEGORICAL_FIELDS:
+                categories = union_categoricals([chunk[field] for chunk in chunks], sort_categories=True).categories
+                for chunk in chunks:
+                    chunk[field] = chunk[field].cat.set_categories(categories)
+        
+        return pd.concat(chunks, ignore_index=True)
+    
     def validate_csc_data(self, df: pd.DataFrame) -> bool:
         """
         验证CSC数据完整性
@@ -126,16 +192,17 @@ class CSCProcessor:
             for field in self.REQUIRED_FIELDS:
                 if field not in df.columns:
                     raise ValueError(f"缺少必填字段: {field}")
-                
-                # 检查必填字段的空值
-                null_count = df[field].isna().sum()
+            
+            # 检查必填字段的空值（一次性统计所有必填字段）
+            null_counts = df[self.REQUIRED_FIELDS].isna().sum()
+            for field, null_count in null_counts.items():
                 if null_count > 0:
                     self.logger.warning(f"字段 {field} 存在 {null_count} 个空值")
             
-            # 检查ID唯一性
-            duplicate_ids = df[df['id'].duplicated()]
-            if not duplicate_ids.empty:
-                self.logger.warning(f"发现 {len(duplicate_ids)} 个重复ID")
+            # 检查ID唯一性（只需计数，不构造重复记录子表）
+            duplicate_count = int(df['id'].duplicated().sum())
+            if duplicate_count > 0:
+                self.logger.warning(f"发现 {duplicate_count} 个重复ID")
             
             # 检查wikiDataId格式
             invalid_wiki_ids = self._validate_wikidata_ids(df)
@@ -164,21 +231,25 @@ class CSCProcessor:
         Returns:
             List[str]: 有效的wikiDataId列表
         """
+        # 同一DataFrame重复提取时（如get_data_summary）直接返回缓存结果
+        if self._wikidata_ids_cache is not None and self._wikidata_ids_cache[0] is df:
+            return list(self._wikidata_ids_cache[1])
+        
         try:
             self.logger.info("开始提取wikiDataId")
             
-            # 过滤空值和无效格式
-            valid_ids = []
-            
-            for idx, wiki_id in df['wikiDataId'].items():
-                if pd.notna(wiki_id) and self._is_valid_wikidata_id(str(wiki_id)):
-                    valid_ids.append(str(wiki_id))
+            # 过滤空值和无效格式（向量化匹配）
+            wiki_ids = df['wikiDataId'].dropna().astype('string')
+            valid_ids = wiki_ids[wiki_ids.str.strip().str.match(_WIKI_RE, na=False)]
             
             # 去重并排序
-            unique_ids = sorted(list(set(valid_ids)))
+            unique_ids = sorted(valid_ids.unique().tolist())
             
             self.logger.info(f"提取到 {len(unique_ids)} 个有效的wikiDataId")
-            return unique_ids
+            
+            # 缓存中保留DataFrame引用，避免对象被回收后id复用导致误命中
+            self._wikidata_ids_cache = (df, unique_ids)
+            return list(unique_ids)
             
         except Exception as e:
             self.logger.error(f"提取wikiDataId失败: {str(e)}")
@@ -197,30 +268,29 @@ class CSCProcessor:
         try:
             self.logger.info("开始清理CSC地名数据")
             
-            # 创建副本避免修改原数据
-            cleaned_df = df.copy()
+            # 只收集需要替换的列，最后通过assign生成新DataFrame，未修改的列不会被复制
+            cleaned_columns = {}
             
             # 清理地名字段
             name_fields = ['name', 'state_name', 'country_name']
             
             for field in name_fields:
-                if field in cleaned_df.columns:
-                    # 去除首尾空格
-                    cleaned_df[field] = cleaned_df[field].str.strip()
-                    
-                    # 标准化引号
-                    cleaned_df[field] = cleaned_df[field].str.replace('"', '', regex=False)
-                    
-                    # 处理特殊字符
-                    cleaned_df[field] = cleaned_df[field].apply(self._clean_name_text)
-            
-            # 标准化国家代码
-            if 'country_code' in cleaned_df.columns:
-                cleaned_df['country_code'] = cleaned_df['country_code'].str.upper().str.strip()
-            
-            # 标准化州代码
-            if 'state_code' in cleaned_df.columns:
-                cleaned_df['state_code'] = cleaned_df['state_code'].str.upper().str.strip()
+                if field in df.columns:
+                    # 标准化引号、合并多余空白、去除首尾空格，清理后为空的名称置为缺失值
+                    cleaned_columns[field] = (
+                        df[field]
+                        .str.replace('"', '', regex=False)
+                        .str.replace(_WS_RE, ' ', regex=True)
+                        .str.strip()
+                        .replace('', pd.NA)
+                    )
+            
+            # 标准化国家代码和州代码
+            for field in ('country_code', 'state_code'):
+                if field in df.columns:
+                    cleaned_columns[field] = self._normalize_code_field(df[field])
+            
+            cleaned_df = df.assign(**cleaned_columns)
             
             self.logger.info("CSC地名数据清理完成")
             return cleaned_df
@@ -229,6 +299,24 @@ class CSCProcessor:
             self.logger.error(f"清理CSC地名数据失败: {str(e)}")
             raise
     
+    def _normalize_code_field(self, codes: pd.Series) -> pd.Series:
+        """
+        标准化代码字段（转大写并去除首尾空格）
+        
+        Args:
+            codes: 国家代码或州代码列
+            
+        Returns:
+            pd.Series: 标准化后的代码列，分类类型的输入仍返回分类类型
+        """
+        if isinstance(codes.dtype, pd.CategoricalDtype):
+            # 只对类别标准化一次（类别数远少于行数），再按类别映射回各行
+            categories = codes.cat.categories
+            normalized = dict(zip(categories, categories.str.upper().str.strip()))
+            return codes.map(normalized).astype('category')
+        
+        return codes.str.upper().str.strip()
+    
     def get_data_summary(self, df: pd.DataFrame) -> Dict[str, any]:
         """
         获取CSC数据摘要信息
@@ -268,13 +356,11 @@ class CSCProcessor:
         Returns:
             List[int]: 无效wikiDataId的行索引
         """
-        invalid_indices = []
-        
-        for idx, wiki_id in df['wikiDataId'].items():
-            if pd.notna(wiki_id) and not self._is_valid_wikidata_id(str(wiki_id)):
-                invalid_indices.append(idx)
+        # 向量化匹配：非空且去除首尾空白后不符合格式的记录视为无效
+        wiki_ids = df['wikiDataId']
+        invalid_mask = wiki_ids.notna() & ~wiki_ids.astype('string').str.strip().str.match(_WIKI_RE, na=False)
         
-        return invalid_indices
+        return df.index[invalid_mask].tolist()
     
     def _validate_coordinates(self, df: pd.DataFrame) -> int:
         """
@@ -288,55 +374,16 @@ class CSCProcessor:
         """
         invalid_count = 0
         
-        # 检查纬度范围 [-90, 90]
+        # 检查纬度范围 [-90, 90]（绝对值单次比较，缺失值不计入）
         if 'latitude' in df.columns:
-            invalid_lat = (df['latitude'] < -90) | (df['latitude'] > 90)
-            invalid_count += invalid_lat.sum()
+            invalid_count += int(np.count_nonzero(np.abs(df['latitude'].to_numpy(dtype='float64', na_value=np.nan)) > 90))
         
         # 检查经度范围 [-180, 180]
         if 'longitude' in df.columns:
-            invalid_lon = (df['longitude'] < -180) | (df['longitude'] > 180)
-            invalid_count += invalid_lon.sum()
+            invalid_count += int(np.count_nonzero(np.abs(df['longitude'].to_numpy(dtype='float64', na_value=np.nan)) > 180))
         
         return invalid_count
     
-    def _is_valid_wikidata_id(self, wiki_id: str) -> bool:
-        """
-        检查wikiDataId格式是否有效
-        
-        Args:
-            wiki_id: wikiDataId字符串
-            
-        Returns:
-            bool: 是否有效
-        """
-        # Wikidata ID格式: Q + 数字
-        pattern = r'^Q\d+$'
-        return bool(re.match(pattern, wiki_id.strip()))
-    
-    def _clean_name_text(self, text: any) -> str:
-        """
-        清理文本内容
-        
-        Args:
-            text: 原始文本
-            
-        Returns:
-            str: 清理后的文本
-        """
-        if pd.isna(text):
-            return text
-        
-        text = str(text)
-        
-        # 去除多余空格
-        text = re.sub(r'\s+', ' ', text)
-        
-        # 去除首尾空格
-        text = text.strip()
-        
-        return text if text else None
-
     def _normalize_csc_name(self, name: str) -> List[str]:
         """
         CSC名称标准化处理，使用AliasProcessor进行统一的别名处理
@@ -369,42 +416,20 @@ class CSCProcessor:
         Returns:
             Dict: 统计信息
         """
+        # 提取国家代码和州名称列，按国家分组计数在pandas中完成
+        city_countries = pd.Series([record.get('country_code', '') for record in city_names], dtype=object)
+        state_countries = pd.Series([record.get('country_code', '') for record in state_names], dtype=object)
+        state_record_names = pd.Series([record.get('name', '') for record in state_names], dtype=object)
+        
         stats = {
             'city_names_count': len(city_names),
             'state_names_count': len(state_names),
-            'unique_countries': set(),
-            'unique_states': set(),
-            'cities_by_country': {},
-            'states_by_country': {}
+            'cities_by_country': city_countries.value_counts(dropna=False, sort=False).to_dict(),
+            'states_by_country': state_countries.value_counts(dropna=False, sort=False).to_dict(),
+            'unique_countries_count': len(pd.unique(pd.concat([city_countries, state_countries]))),
+            'unique_states_count': state_record_names.nunique(dropna=False)
         }
         
-        # 统计city_names
-        for record in city_names:
-            country = record.get('country_code', '')
-            stats['unique_countries'].add(country)
-            
-            if country not in stats['cities_by_country']:
-                stats['cities_by_country'][country] = 0
-            stats['cities_by_country'][country] += 1
-        
-        # 统计state_names
-        for record in state_names:
-            country = record.get('country_code', '')
-            stats['unique_countries'].add(country)
-            stats['unique_states'].add(record.get('name', ''))
-            
-            if country not in stats['states_by_country']:
-                stats['states_by_country'][country] = 0
-            stats['states_by_country'][country] += 1
-        
-        # 转换集合为计数
-        stats['unique_countries_count'] = len(stats['unique_countries'])
-        stats['unique_states_count'] = len(stats['unique_states'])
-        
-        # 移除集合（不可序列化）
-        del stats['unique_countries']
-        del stats['unique_states']
-        
         return stats
     
     def process_csc_integration1(self, enable_cache: bool = True) -> pd.DataFrame:
@@ -533,10 +558,12 @@ class CSCProcessor:
         Returns:
             pd.DataFrame: 包含geonameid的enriched数据
         """
-        enriched_data = csc_data.copy()
-        
-        # 添加matched_geonameid列
-        enriched_data['matched_geonameid'] = enriched_data['wikiDataId'].map(geonameid_mapping)
+        # 添加matched_geonameid列（将映射字典转为Series后按wikiDataId整列reindex，哈希查找在C层完成）
+        # 使用assign只新增一列，不复制原有数据
+        geonameid_lookup = pd.Series(geonameid_mapping)
+        enriched_data = csc_data.assign(
+            matched_geonameid=geonameid_lookup.reindex(csc_data['wikiDataId'].to_numpy()).to_numpy()
+        )
         
         # 记录匹配统计
         matched_count = enriched_data['matched_geonameid'].notna().sum()
@@ -585,30 +612,35 @@ class CSCProcessor:
         aliases_dict = {}
         
         # 处理有geonameid匹配的记录
-        matched_data = enriched_data[enriched_data['matched_geonameid'].notna()]
+        matched_data = enriched_data.loc[enriched_data['matched_geonameid'].notna(), ['matched_geonameid', 'name']]
+        
+        # 向量化清理名称（合并多余空白、去除首尾空格），过滤清理后为空的名称
+        csc_names = matched_data['name'].astype('string').str.replace(_WS_RE, ' ', regex=True).str.strip()
+        valid_mask = csc_names.notna() & (csc_names != '')
+        csc_names = csc_names[valid_mask]
+        
+        # 所有不重复的名称一次性交给AliasProcessor向量化处理，获取各名称的别名变体
+        unique_names = pd.Series(csc_names.unique(), dtype=object)
+        name_aliases = dict(zip(unique_names, self.alias_processor.process_alternatenames_series(unique_names)))
         
-        for _, row in matched_data.iterrows():
-            geonameid = str(row['matched_geonameid'])
-            csc_name = self._clean_name_text(row['name'])
+        # 按geonameid分组，同一geonameid下的重复名称只合并一次
+        for geonameid, names in csc_names.groupby(matched_data['matched_geonameid'][valid_mask], sort=False):
+            # 使用dict作为有序集合去重，保持别名首次出现的顺序
+            aliases = {}
             
-            if geonameid and csc_name:
-                if geonameid not in aliases_dict:
-                    aliases_dict[geonameid] = []
-                
-                # 使用AliasProcessor处理CSC名称，获取所有别名变体
-                processed_aliases = self.alias_processor.process_alternatenames([csc_name])
-                
+            for csc_name in names.unique():
                 # 添加所有处理后的别名（包括原始名称和变体）
-                for alias in processed_aliases:
-                    if alias and alias not in aliases_dict[geonameid]:
-                        aliases_dict[geonameid].append(alias)
+                aliases.update(dict.fromkeys(alias for alias in name_aliases[csc_name] if alias))
+            
+            aliases_dict[str(geonameid)] = list(aliases)
         
         self.logger.info(f"生成CSC别名字典: {len(aliases_dict)} 个geonameid")
         
         return aliases_dict
     
     def _collect_integration_stats(self, enriched_data: pd.DataFrame,
-                                 geonameid_mapping: Dict[str, str], wikidata_ids: List[str]) -> Dict[str, Any]:
+                                 geonameid_mapping: Dict[str, str], wikidata_ids: List[str],
+                                 detailed: bool = False) -> Dict[str, Any]:
         """
         收集集成处理的统计信息
         
@@ -616,6 +648,7 @@ class CSCProcessor:
             enriched_data: 包含geonameid的enriched数据
             geonameid_mapping: geonameid映射字典
             wikidata_ids: wikidata ID列表
+            detailed: 是否精确统计内存占用（需遍历所有字符串对象，大数据量时很慢），默认False
             
         Returns:
             Dict[str, Any]: 统计信息字典
@@ -630,30 +663,37 @@ class CSCProcessor:
         # 计算覆盖率统计
         countries_covered = enriched_data['country_code'].nunique() if not enriched_data.empty else 0
         
-        # 内存使用统计
+        # 内存使用统计（默认只统计列缓冲区大小，不遍历字符串对象）
         memory_stats = {
-            "enriched_data_memory_mb": enriched_data.memory_usage(deep=True).sum() / 1024 / 1024 if not enriched_data.empty else 0
+            "enriched_data_memory_mb": enriched_data.memory_usage(deep=detailed).sum() / 1024 / 1024 if not enriched_data.empty else 0
         }
         
-        # 数据分布统计
+        # 数据分布统计（各列的缺失值掩码只计算一次，供多个统计项复用）
         distribution_stats = {}
+        cities_generated = 0
+        states_generated = 0
         if not enriched_data.empty:
+            coordinates_missing = enriched_data['latitude'].isna().to_numpy() | enriched_data['longitude'].isna().to_numpy()
+            geonameid_missing = enriched_data['matched_geonameid'].isna().to_numpy()
+            records_missing_coordinates = int(np.count_nonzero(coordinates_missing))
+            records_missing_geonameid = int(np.count_nonzero(geonameid_missing))
+            
             distribution_stats["records_by_country"] = enriched_data['country_code'].value_counts().to_dict()
             distribution_stats["coordinate_coverage"] = {
-                "records_with_coordinates": enriched_data[['latitude', 'longitude']].notna().all(axis=1).sum(),
-                "records_missing_coordinates": enriched_data[['latitude', 'longitude']].isna().any(axis=1).sum()
+                "records_with_coordinates": len(enriched_data) - records_missing_coordinates,
+                "records_missing_coordinates": records_missing_coordinates
             }
             distribution_stats["geonameid_coverage"] = {
-                "records_with_geonameid": enriched_data['matched_geonameid'].notna().sum(),
-                "records_missing_geonameid": enriched_data['matched_geonameid'].isna().sum()
+                "records_with_geonameid": len(enriched_data) - records_missing_geonameid,
+                "records_missing_geonameid": records_missing_geonameid
             }
-        
-        # 计算生成的城市和州数量
-        cities_generated = enriched_data[enriched_data['matched_geonameid'].notna()].shape[0] if not enriched_data.empty else 0
-        states_generated = enriched_data[
-            (enriched_data['state_id'].notna()) & 
-            (enriched_data['state_name'].notna())
-        ][['state_id', 'state_name', 'country_code']].drop_duplicates().shape[0] if not enriched_data.empty else 0
+            
+            # 计算生成的城市和州数量
+            cities_generated = len(enriched_data) - records_missing_geonameid
+            state_mask = enriched_data['state_id'].notna().to_numpy() & enriched_data['state_name'].notna().to_numpy()
+            states_generated = len(
+                enriched_data.loc[state_mask, ['state_id', 'state_name', 'country_code']].drop_duplicates()
+            )
         
         stats = {
             "total_records": len(enriched_data),
@@ -10,14 +10,69 @@ CSV导出模块
 - city_names.csv: 存储city名称映射
 """
 
+import csv
+import gzip
+import io
 import os
+import re
+import numpy as np
 import pandas as pd
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
+# 安装了pyarrow时，可通过backend='pyarrow'使用Arrow的C++ CSV写入器导出
+# （字符串字段总是加引号、浮点数格式与pandas不同，因此默认仍使用pandas写出）
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = None
+    pacsv = None
+
+# 安装了polars时，可通过backend='polars'使用其多线程CSV写入器
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+# CSV字段中需要加引号的字符（分隔符、引号、换行）
+_QUOTE_CHARS = ',"\n'
+_QUOTE_RE = re.compile('[,"\n]')
+
+# GeoNames完整字段列表（19个字段），states/cities按此顺序导出
+_GEONAMES_COLUMNS = (
+    'geonameid', 'name', 'asciiname', 'alternatenames',
+    'latitude', 'longitude', 'feature_class', 'feature_code',
+    'country_code', 'cc2', 'admin1_code', 'admin2_code',
+    'admin3_code', 'admin4_code', 'population', 'elevation',
+    'dem', 'timezone', 'modification_date'
+)
+
+# 名称表与映射表的导出字段（按导出顺序）
+_STATE_NAMES_COLUMNS = ('country_code', 'name', 'admin1_code', 'geonameid')
+_CITY_NAMES_COLUMNS = ('country_code', 'admin1_code', 'state_geonameid', 'name', 'geonameid')
+_CSC_MAPPING_COLUMNS = ('id', 'name', 'state_id', 'state_code', 'state_name', 'country_id', 'country_code',
+                        'country_name', 'latitude', 'longitude', 'wikiDataId', 'geonameid')
+
 class CSVExporter:
     """CSV导出器"""
     
+    # 写文件缓冲区大小（8MB），减少大文件导出时的write系统调用次数
+    WRITE_BUFFER_SIZE = 8 * 1024 * 1024
+    
+    # 默认每批写出的行数
+    EXPORT_CHUNK_SIZE = 1_000_000
+    
+    # 行数达到该值时才检查列的内存布局，小数据复制带来的收益抵不过开销
+    COLUMN_MAJOR_MIN_ROWS = 100_000
+    
+    # 压缩格式对应的文件扩展名
+    COMPRESSION_EXTENSIONS = {'gzip': '.gz', 'zstd': '.zst'}
+    
+    # 导出的CSV文件名（未压缩时的文件名）
+    EXPORT_FILES = ('states.csv', 'cities.csv', 'state_names.csv', 'city_names.csv', 'csc_mapping.csv')
+    
     def __init__(self, output_dir: str = 'csv_output'):
         """初始化CSV导出器
         
@@ -27,215 +82,418 @@ class CSVExporter:
         self.output_dir = output_dir
         self.logger = logging.getLogger(__name__)
         
-        # 确保输出目录存在
-        if not os.path.exists(self.output_dir):
-            os.makedirs(self.output_dir)
-            self.logger.info(f"创建输出目录: {self.output_dir}")
+        # 确保输出目录存在（exist_ok避免并发创建时的竞争）
+        os.makedirs(self.output_dir, exist_ok=True)
     
-    def export_states(self, states_df: pd.DataFrame, filename: str = 'states.csv') -> bool:
+    def _get_output_path(self, filename: str, compression: Optional[str] = None) -> str:
         """
-        导出states表到CSV文件（包含完整的geonames原始信息）
+        获取输出文件路径，启用压缩时自动追加压缩扩展名
         
         Args:
-            states_df: states数据DataFrame
             filename: 输出文件名
+            compression: 压缩格式（'gzip'或'zstd'），None表示不压缩
             
         Returns:
-            bool: 导出是否成功
+            str: 输出文件路径
+        """
+        extension = self.COMPRESSION_EXTENSIONS.get(compression, '')
+        if extension and not filename.endswith(extension):
+            filename += extension
+        return os.path.join(self.output_dir, filename)
+    
+    def _write_arrow_csv(self, export_df: pd.DataFrame, output_path: str, compression: Optional[str] = None,
+                         chunksize: int = EXPORT_CHUNK_SIZE) -> None:
+        """
+        使用pyarrow的CSV写入器写出CSV文件，数据无法转换为Arrow表时回退到pandas
+        
+        Args:
+            export_df: 待导出的DataFrame
+            output_path: 输出文件路径
+            compression: 压缩格式（'gzip'或'zstd'），None表示不压缩
+            chunksize: 每批写出的行数，限制格式化中间结果的峰值内存
         """
         try:
-            if states_df.empty:
-                self.logger.warning("States数据为空，跳过导出")
-                return False
-            
-            # GeoNames完整字段列表（19个字段）
-            all_columns = [
-                'geonameid', 'name', 'asciiname', 'alternatenames',
-                'latitude', 'longitude', 'feature_class', 'feature_code',
-                'country_code', 'cc2', 'admin1_code', 'admin2_code',
-                'admin3_code', 'admin4_code', 'population', 'elevation',
-                'dem', 'timezone', 'modification_date'
-            ]
-            
-            # 检查可用字段
-            available_columns = [col for col in all_columns if col in states_df.columns]
-            missing_columns = [col for col in all_columns if col not in states_df.columns]
-            
-            if missing_columns:
-                self.logger.warning(f"States数据缺少字段: {missing_columns}，将导出可用字段")
+            # safe=False跳过数值转换的溢出检查，多线程按列转换；Arrow字符串列可零拷贝转换
+            table = pa.Table.from_pandas(export_df, preserve_index=False, safe=False, nthreads=os.cpu_count())
+        except (pa.ArrowTypeError, pa.ArrowInvalid) as e:
+            # 混合类型的object列（如整数与字符串混排、列表）无法转换为Arrow类型
+            self.logger.debug(f"数据无法转换为Arrow表，使用pandas写出: {e}")
+            self._write_csv(export_df, output_path, compression, chunksize)
+            return
+        
+        write_options = pacsv.WriteOptions(include_header=True, delimiter=',', quoting_style='needed')
+        # CompressedOutputStream无法指定压缩级别：gzip通过gzip模块以级别1写出；
+        # zstd使用Arrow的默认级别（即级别1）
+        if compression == 'gzip':
+            sink = gzip.open(output_path, 'wb', compresslevel=1)
+        elif compression:
+            sink = pa.CompressedOutputStream(output_path, compression)
+        else:
+            sink = pa.OSFile(output_path, 'wb')
+        with sink, pacsv.CSVWriter(sink, table.schema, write_options=write_options) as writer:
+            for batch in table.to_batches(max_chunksize=chunksize):
+                writer.write_batch(batch)
+    
+    def _write_polars_csv(self, export_df: pd.DataFrame, output_path: str) -> None:
+        """
+        使用polars的多线程CSV写入器写出CSV文件
+        
+        Args:
+            export_df: 待导出的DataFrame
+            output_path: 输出文件路径
+        """
+        # rechunk=False避免转换时额外合并复制一次数据
+        pl.from_pandas(export_df, rechunk=False).write_csv(output_path)
+    
+    def _write_csv(self, export_df: pd.DataFrame, output_path: str, compression: Optional[str] = None,
+                   chunksize: int = EXPORT_CHUNK_SIZE) -> None:
+        """
+        使用pandas写出CSV文件，通过大缓冲区的二进制文件句柄写入
+        
+        Args:
+            export_df: 待导出的DataFrame
+            output_path: 输出文件路径
+            compression: 压缩格式（'gzip'或'zstd'），None表示不压缩
+            chunksize: 每批写出的行数，限制格式化中间结果的峰值内存
+        """
+        # 使用最低压缩级别，压缩率已足够且写出速度远快于默认级别
+        if compression == 'gzip':
+            compression_options = {'method': 'gzip', 'compresslevel': 1}
+        elif compression == 'zstd':
+            compression_options = {'method': 'zstd', 'level': 1}
+        else:
+            compression_options = compression
+        
+        # 无需压缩且字段类型可批量格式化时，直接拼接文本写出
+        if compression is None and self._write_plain_csv(export_df, output_path, chunksize):
+            return
+        
+        with open(output_path, 'wb', buffering=self.WRITE_BUFFER_SIZE) as f:
+            export_df.to_csv(f, index=False, encoding='utf-8', compression=compression_options, chunksize=chunksize)
+    
+    def _write_plain_csv(self, export_df: pd.DataFrame, output_path: str,
+                         chunksize: int = EXPORT_CHUNK_SIZE) -> bool:
+        """
+        快速路径：逐列批量格式化后按行块拼接CSV文本写出
+        
+        整数、浮点数列按列整体转换为文本（浮点数与pandas一样使用numpy的最短往返表示），
+        只有包含分隔符、引号或换行的字符串才逐个加引号，输出与pandas的to_csv逐字节一致
+        
+        Args:
+            export_df: 待导出的DataFrame
+            output_path: 输出文件路径
+            chunksize: 每批格式化并写出的行数
             
-            # 选择可用字段并保持原始顺序
-            export_df = states_df[available_columns].copy()
+        Returns:
+            bool: 是否已通过快速路径写出，False表示需要回退到pandas（已写出的部分会被覆盖）
+        """
+        # 单列时csv模块会把空值写为""，交由pandas处理
+        if len(export_df.columns) < 2:
+            return False
+        
+        header = list(map(str, export_df.columns))
+        if any('\r' in name for name in header):
+            return False
+        header = [self._quote_csv_field(name) if _QUOTE_RE.search(name) else name for name in header]
+        
+        with open(output_path, 'w', encoding='utf-8', newline='', buffering=self.WRITE_BUFFER_SIZE) as f:
+            f.write(','.join(header))
+            f.write(os.linesep)
+            for start in range(0, len(export_df), chunksize):
+                columns = self._format_csv_columns(export_df.iloc[start:start + chunksize])
+                if columns is None:
+                    return False
+                f.write(os.linesep.join(map(','.join, zip(*columns))))
+                f.write(os.linesep)
+        return True
+    
+    def _format_csv_columns(self, chunk: pd.DataFrame) -> Optional[list]:
+        """
+        将一个行块的各列批量格式化为CSV字段文本
+        
+        Args:
+            chunk: 行块DataFrame
             
-            # 导出到CSV
-            output_path = os.path.join(self.output_dir, filename)
-            export_df.to_csv(output_path, index=False, encoding='utf-8')
+        Returns:
+            Optional[list]: 各列的字段文本序列，含有无法快速格式化的列时返回None
+        """
+        columns = []
+        for name, dtype in chunk.dtypes.items():
+            series = chunk[name]
+            if dtype.kind in 'iu':
+                if isinstance(dtype, np.dtype):
+                    values = list(map(str, series.to_numpy().tolist()))
+                else:
+                    # 可空整数类型，缺失值写为空字符串
+                    values = list(map(str, series.to_numpy(dtype=object, na_value='')))
+            elif dtype.kind == 'f' and isinstance(dtype, np.dtype):
+                raw = series.to_numpy()
+                values = raw.astype(str).astype(object)
+                values[np.isnan(raw)] = ''
+            elif dtype == object or isinstance(dtype, pd.StringDtype):
+                values = series.to_numpy(dtype=object, na_value='')
+                try:
+                    joined = '\x00'.join(values)
+                except TypeError:
+                    # 含有非字符串对象，交由pandas格式化
+                    return None
+                if '\r' in joined:
+                    # csv模块对\r是否加引号取决于行结束符，交由pandas处理
+                    return None
+                if any(ch in joined for ch in _QUOTE_CHARS):
+                    values = [self._quote_csv_field(v) if _QUOTE_RE.search(v) else v for v in values]
+            else:
+                return None
+            columns.append(values)
+        return columns
+    
+    @staticmethod
+    def _quote_csv_field(value: str) -> str:
+        """
+        按csv模块QUOTE_MINIMAL规则给字段加引号（内部引号双写）
+        
+        Args:
+            value: 字段文本
             
-            self.logger.info(f"成功导出{len(export_df)}条states记录到 {output_path}（包含{len(available_columns)}个字段）")
-            return True
+        Returns:
+            str: 加引号后的字段
+        """
+        return '"' + value.replace('"', '""') + '"'
+    
+    def _resolve_backend(self, backend: Optional[str], compression: Optional[str] = None) -> Optional[str]:
+        """
+        检查请求的CSV写出后端是否可用，不可用时记录警告并回退到pandas写出
+        
+        Args:
+            backend: 请求的写出后端（'polars'、'pyarrow'或None）
+            compression: 压缩格式（'gzip'或'zstd'），None表示不压缩
             
-        except Exception as e:
-            self.logger.error(f"导出states数据时出错: {e}")
-            return False
+        Returns:
+            Optional[str]: 实际使用的写出后端，None表示使用pandas写出
+        """
+        if backend is None:
+            return None
+        if backend == 'polars':
+            if pl is None:
+                self.logger.warning("未安装polars，使用默认方式导出CSV文件")
+                return None
+            if compression is not None:
+                self.logger.warning(f"polars写出不支持{compression}压缩，使用默认方式导出CSV文件")
+                return None
+        elif backend == 'pyarrow':
+            if pacsv is None:
+                self.logger.warning("未安装pyarrow，使用默认方式导出CSV文件")
+                return None
+        else:
+            self.logger.warning(f"不支持的CSV写出后端: {backend}，使用默认方式导出CSV文件")
+            return None
+        return backend
     
-    def export_cities(self, cities_df: pd.DataFrame, filename: str = 'cities.csv') -> bool:
+    def _export_df(self, df: pd.DataFrame, table_name: str, filename: str,
+                   required_columns: tuple = (), optional_columns: tuple = (),
+                   compression: Optional[str] = None,
+                   chunksize: int = EXPORT_CHUNK_SIZE, backend: Optional[str] = None) -> bool:
         """
-        导出cities表到CSV文件（包含完整的geonames原始信息）
+        通用的字段校验与CSV导出流程
         
         Args:
-            cities_df: cities数据DataFrame
+            df: 待导出的DataFrame
+            table_name: 表名（用于日志）
             filename: 输出文件名
+            required_columns: 必要字段，缺少任一字段时放弃导出
+            optional_columns: 可选字段，缺少的字段跳过并导出其余可用字段
+            compression: 压缩格式（'gzip'或'zstd'），None表示不压缩
+            chunksize: 每批写出的行数
+            backend: CSV写出后端，'polars'表示使用polars写出（未安装polars或启用压缩时记录警告并忽略），
+                'pyarrow'表示使用Arrow的CSV写入器（未安装pyarrow时记录警告并忽略）；None使用pandas写出
             
         Returns:
             bool: 导出是否成功
         """
+        output_path = None
         try:
-            if cities_df.empty:
-                self.logger.warning("Cities数据为空，跳过导出")
+            if len(df) == 0:
+                self.logger.warning(f"{table_name.capitalize()}数据为空，跳过导出")
                 return False
             
-            # GeoNames完整字段列表（19个字段）
-            all_columns = [
-                'geonameid', 'name', 'asciiname', 'alternatenames',
-                'latitude', 'longitude', 'feature_class', 'feature_code',
-                'country_code', 'cc2', 'admin1_code', 'admin2_code',
-                'admin3_code', 'admin4_code', 'population', 'elevation',
-                'dem', 'timezone', 'modification_date'
-            ]
-            
-            # 检查可用字段
-            available_columns = [col for col in all_columns if col in cities_df.columns]
-            missing_columns = [col for col in all_columns if col not in cities_df.columns]
-            
-            if missing_columns:
-                self.logger.warning(f"Cities数据缺少字段: {missing_columns}，将导出可用字段")
+            columns = df.columns
+            if required_columns:
+                missing_columns = [col for col in required_columns if col not in columns]
+                if missing_columns:
+                    self.logger.error(f"{table_name.capitalize()}数据缺少必要字段: {missing_columns}")
+                    return False
+                export_columns = required_columns
+            elif tuple(columns) == optional_columns:
+                # 字段已完全一致时直接使用原数据
+                export_columns = optional_columns
+            else:
+                # 检查可用字段（Index的成员判断为哈希查找）
+                export_columns = [col for col in optional_columns if col in columns]
+                missing_columns = [col for col in optional_columns if col not in columns]
+                if missing_columns:
+                    self.logger.warning(f"{table_name.capitalize()}数据缺少字段: {missing_columns}，将导出可用字段")
+            
+            # 选择并排序字段（字段顺序已一致时直接使用原数据；写出时不会修改数据，无需复制）
+            if tuple(columns) == tuple(export_columns):
+                export_df = df
+            else:
+                export_df = df[list(export_columns)]
             
-            # 选择可用字段并保持原始顺序
-            export_df = cities_df[available_columns].copy()
+            # 按列写出时，列在内存中不连续的数据块会显著拖慢格式化，先一次性重排
+            export_df = self._ensure_column_major(export_df, table_name)
             
             # 导出到CSV
-            output_path = os.path.join(self.output_dir, filename)
-            export_df.to_csv(output_path, index=False, encoding='utf-8')
-            
-            self.logger.info(f"成功导出{len(export_df)}条cities记录到 {output_path}（包含{len(available_columns)}个字段）")
+            output_path = self._get_output_path(filename, compression)
+            backend = self._resolve_backend(backend, compression)
+            if backend == 'polars':
+                self._write_polars_csv(export_df, output_path)
+            elif backend == 'pyarrow':
+                self._write_arrow_csv(export_df, output_path, compression, chunksize)
+            else:
+                self._write_csv(export_df, output_path, compression, chunksize)
+            
+            # 日志被屏蔽时不构造消息
+            if self.logger.isEnabledFor(logging.INFO):
+                if optional_columns:
+                    self.logger.info("成功导出%d条%s记录到 %s（包含%d个字段）",
+                                     len(export_df), table_name, output_path, len(export_columns))
+                else:
+                    self.logger.info("成功导出%d条%s记录到 %s", len(export_df), table_name, output_path)
             return True
             
         except Exception as e:
-            self.logger.error(f"导出cities数据时出错: {e}")
+            self.logger.error(f"导出{table_name}数据时出错: {e}")
+            # 删除写出失败时残留的不完整文件（如缺少zstandard时pandas已创建的空文件）
+            if output_path is not None and os.path.exists(output_path):
+                os.remove(output_path)
             return False
     
-    def export_state_names(self, state_names_df: pd.DataFrame, filename: str = 'state_names.csv') -> bool:
-        """导出state_names表到CSV文件
+    def _ensure_column_major(self, export_df: pd.DataFrame, table_name: str) -> pd.DataFrame:
+        """
+        检查数据块的内存布局，列不连续时复制为按列连续的布局
+        
+        由行优先（C顺序）二维数组构造的DataFrame，其数据块中每一列都是跨步访问的，
+        而CSV写出是逐列格式化的；此时复制一次（pandas的数据块按列存储，复制后每列连续），
+        把逐列访问的开销转为一次性的复制开销
         
         Args:
-            state_names_df: state_names数据DataFrame
+            export_df: 待导出的DataFrame
+            table_name: 表名（用于日志）
+            
+        Returns:
+            pd.DataFrame: 列连续的DataFrame（不修改原数据）
+        """
+        if len(export_df) < self.COLUMN_MAJOR_MIN_ROWS:
+            return export_df
+        
+        for i, dtype in enumerate(export_df.dtypes):
+            # numpy类型的列取出的是数据块的视图，不连续即说明数据块为行优先布局
+            if isinstance(dtype, np.dtype) and not export_df.iloc[:, i].to_numpy().flags['C_CONTIGUOUS']:
+                self.logger.debug(f"{table_name.capitalize()}数据为行优先内存布局，导出前复制为按列连续的布局")
+                return export_df.copy()
+        return export_df
+    
+    def export_states(self, states_df: pd.DataFrame, filename: str = 'states.csv',
+                      compression: Optional[str] = None, chunksize: int = EXPORT_CHUNK_SIZE,
+                      backend: Optional[str] = None) -> bool:
+        """
+        导出states表到CSV文件（包含完整的geonames原始信息）
+        
+        Args:
+            states_df: states数据DataFrame
             filename: 输出文件名
+            compression: 压缩格式（'gzip'或'zstd'），None表示不压缩，启用时自动追加.gz/.zst扩展名
+            chunksize: 每批写出的行数，限制大表导出时的峰值内存
+            backend: CSV写出后端，'polars'表示使用polars的多线程写入器，'pyarrow'表示使用Arrow的CSV写入器
             
         Returns:
             bool: 导出是否成功
         """
-        try:
-            if state_names_df.empty:
-                self.logger.warning("State_names数据为空，跳过导出")
-                return False
-            
-            # 确保字段顺序正确
-            expected_columns = ['country_code', 'name', 'admin1_code', 'geonameid']
-            missing_columns = [col for col in expected_columns if col not in state_names_df.columns]
-            if missing_columns:
-                self.logger.error(f"State_names数据缺少必要字段: {missing_columns}")
-                return False
-            
-            # 选择并排序字段
-            export_df = state_names_df[expected_columns].copy()
-            
-            # 导出到CSV
-            output_path = os.path.join(self.output_dir, filename)
-            export_df.to_csv(output_path, index=False, encoding='utf-8')
+        return self._export_df(states_df, 'states', filename, optional_columns=_GEONAMES_COLUMNS,
+                               compression=compression, chunksize=chunksize,
+                               backend=backend)
+    
+    def export_cities(self, cities_df: pd.DataFrame, filename: str = 'cities.csv',
+                      compression: Optional[str] = None, chunksize: int = EXPORT_CHUNK_SIZE,
+                      backend: Optional[str] = None) -> bool:
+        """
+        导出cities表到CSV文件（包含完整的geonames原始信息）
+        
+        Args:
+            cities_df: cities数据DataFrame
+            filename: 输出文件名
+            compression: 压缩格式（'gzip'或'zstd'），None表示不压缩，启用时自动追加.gz/.zst扩展名
+            chunksize: 每批写出的行数，限制大表导出时的峰值内存
+            backend: CSV写出后端，'polars'表示使用polars的多线程写入器，'pyarrow'表示使用Arrow的CSV写入器
             
-            self.logger.info(f"成功导出{len(export_df)}条state_names记录到 {output_path}")
-            return True
+        Returns:
+            bool: 导出是否成功
+        """
+        return self._export_df(cities_df, 'cities', filename, optional_columns=_GEONAMES_COLUMNS,
+                               compression=compression, chunksize=chunksize,
+                               backend=backend)
+    
+    def export_state_names(self, state_names_df: pd.DataFrame, filename: str = 'state_names.csv',
+                           compression: Optional[str] = None, chunksize: int = EXPORT_CHUNK_SIZE,
+                           backend: Optional[str] = None) -> bool:
+        """导出state_names表到CSV文件
+        
+        Args:
+            state_names_df: state_names数据DataFrame
+            filename: 输出文件名
+            compression: 压缩格式（'gzip'或'zstd'），None表示不压缩，启用时自动追加.gz/.zst扩展名
+            chunksize: 每批写出的行数，限制大表导出时的峰值内存
+            backend: CSV写出后端，'polars'表示使用polars的多线程写入器，'pyarrow'表示使用Arrow的CSV写入器
             
-        except Exception as e:
-            self.logger.error(f"导出state_names数据时出错: {e}")
-            return False
+        Returns:
+            bool: 导出是否成功
+        """
+        return self._export_df(state_names_df, 'state_names', filename,
+                               required_columns=_STATE_NAMES_COLUMNS, compression=compression,
+                               chunksize=chunksize, backend=backend)
     
-    def export_city_names(self, city_names_df: pd.DataFrame, filename: str = 'city_names.csv') -> bool:
+    def export_city_names(self, city_names_df: pd.DataFrame, filename: str = 'city_names.csv',
+                          compression: Optional[str] = None, chunksize: int = EXPORT_CHUNK_SIZE,
+                          backend: Optional[str] = None) -> bool:
         """导出city_names表到CSV文件
         
         Args:
             city_names_df: city_names数据DataFrame
             filename: 输出文件名
+            compression: 压缩格式（'gzip'或'zstd'），None表示不压缩，启用时自动追加.gz/.zst扩展名
+            chunksize: 每批写出的行数，限制大表导出时的峰值内存
+            backend: CSV写出后端，'polars'表示使用polars的多线程写入器，'pyarrow'表示使用Arrow的CSV写入器
             
         Returns:
             bool: 导出是否成功
         """
-        try:
-            if city_names_df.empty:
-                self.logger.warning("City_names数据为空，跳过导出")
-                return False
-            
-            # 确保字段顺序正确
-            expected_columns = ['country_code', 'admin1_code', 'state_geonameid', 'name', 'geonameid']
-            missing_columns = [col for col in expected_columns if col not in city_names_df.columns]
-            if missing_columns:
-                self.logger.error(f"City_names数据缺少必要字段: {missing_columns}")
-                return False
-            
-            # 选择并排序字段
-            export_df = city_names_df[expected_columns].copy()
-            
-            # 导出到CSV
-            output_path = os.path.join(self.output_dir, filename)
-            export_df.to_csv(output_path, index=False, encoding='utf-8')
-            
-            self.logger.info(f"成功导出{len(export_df)}条city_names记录到 {output_path}")
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"导出city_names数据时出错: {e}")
-            return False
+        return self._export_df(city_names_df, 'city_names', filename,
+                               required_columns=_CITY_NAMES_COLUMNS, compression=compression,
+                               chunksize=chunksize, backend=backend)
     
-    def export_csc_mapping(self, csc_mapping_df: pd.DataFrame, filename: str = 'csc_mapping.csv') -> bool:
+    def export_csc_mapping(self, csc_mapping_df: pd.DataFrame, filename: str = 'csc_mapping.csv',
+                           compression: Optional[str] = None, chunksize: int = EXPORT_CHUNK_SIZE,
+                           backend: Optional[str] = None) -> bool:
         """导出csc_mapping表到CSV文件
         
         Args:
             csc_mapping_df: csc_mapping数据DataFrame
             filename: 输出文件名
+            compression: 压缩格式（'gzip'或'zstd'），None表示不压缩，启用时自动追加.gz/.zst扩展名
+            chunksize: 每批写出的行数，限制大表导出时的峰值内存
+            backend: CSV写出后端，'polars'表示使用polars的多线程写入器，'pyarrow'表示使用Arrow的CSV写入器
             
         Returns:
             bool: 导出是否成功
         """
-        try:
-            if csc_mapping_df.empty:
-                self.logger.warning("Csc_mapping数据为空，跳过导出")
-                return False
-            
-            # 确保字段顺序正确
-            # expected_columns = ['csc_id', 'wikidata_id', 'geonameid']
-            expected_columns = ['id', 'name', 'state_id', 'state_code', 'state_name', 'country_id', 'country_code', 'country_name', 'latitude', 'longitude', 'wikiDataId', 'geonameid']
-            missing_columns = [col for col in expected_columns if col not in csc_mapping_df.columns]
-            if missing_columns:
-                self.logger.error(f"Csc_mapping数据缺少必要字段: {missing_columns}")
-                return False
-            
-            # 选择并排序字段
-            export_df = csc_mapping_df[expected_columns].copy()
-            
-            # 导出到CSV
-            output_path = os.path.join(self.output_dir, filename)
-            export_df.to_csv(output_path, index=False, encoding='utf-8')
-            
-            self.logger.info(f"成功导出{len(export_df)}条csc_mapping记录到 {output_path}")
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"导出csc_mapping数据时出错: {e}")
-            return False
+        return self._export_df(csc_mapping_df, 'csc_mapping', filename,
+                               required_columns=_CSC_MAPPING_COLUMNS, compression=compression,
+                               chunksize=chunksize, backend=backend)
 
     def export_all(self, states_df: pd.DataFrame, cities_df: pd.DataFrame, 
                    state_names_df: pd.DataFrame, city_names_df: pd.DataFrame,
-                   csc_mapping_df: pd.DataFrame) -> bool:
+                   csc_mapping_df: pd.DataFrame, compression: Optional[str] = None,
+                   chunksize: int = EXPORT_CHUNK_SIZE, backend: Optional[str] = None) -> bool:
         """导出所有表到CSV文件
         
         Args:
@@ -244,6 +502,10 @@ class CSVExporter:
             state_names_df: state_names数据DataFrame
             city_names_df: city_names数据DataFrame
             csc_mapping_df: csc_mapping数据DataFrame
+            compression: 压缩格式（'gzip'或'zstd'），None表示不压缩
+            chunksize: 每批写出的行数
+            backend: CSV写出后端，'polars'表示使用polars的多线程写入器，'pyarrow'表示使用Arrow的CSV写入器
+                （未安装时回退到默认写出方式）
             
         Returns:
             bool: 所有导出是否成功
@@ -251,12 +513,24 @@ class CSVExporter:
         try:
             self.logger.info("开始导出所有CSV文件...")
             
-            results = []
-            results.append(self.export_states(states_df))
-            results.append(self.export_cities(cities_df))
-            results.append(self.export_state_names(state_names_df))
-            results.append(self.export_city_names(city_names_df))
-            results.append(self.export_csc_mapping(csc_mapping_df))
+            # 写出后端只检查一次，不可用时在这里提示，不再由每个文件重复提示
+            backend = self._resolve_backend(backend, compression)
+            
+            # 各文件相互独立，并发写出（Arrow写入器和文件I/O会释放GIL）
+            with ThreadPoolExecutor(max_workers=5) as executor:
+                futures = [
+                    executor.submit(self.export_states, states_df, compression=compression, chunksize=chunksize,
+                                    backend=backend),
+                    executor.submit(self.export_cities, cities_df, compression=compression, chunksize=chunksize,
+                                    backend=backend),
+                    executor.submit(self.export_state_names, state_names_df, compression=compression, chunksize=chunksize,
+                                    backend=backend),
+                    executor.submit(self.export_city_names, city_names_df, compression=compression, chunksize=chunksize,
+                                    backend=backend),
+                    executor.submit(self.export_csc_mapping, csc_mapping_df, compression=compression, chunksize=chunksize,
+                                    backend=backend)
+                ]
+                results = [future.result() for future in futures]
             
             success_count = sum(results)
             total_count = len(results)
@@ -272,6 +546,60 @@ class CSVExporter:
             self.logger.error(f"批量导出CSV文件时出错: {e}")
             return False
     
+    def _find_export_file(self, filename: str) -> Optional[str]:
+        """
+        查找导出文件，依次尝试未压缩文件名和各压缩格式的文件名
+        
+        Args:
+            filename: 未压缩的文件名
+            
+        Returns:
+            Optional[str]: 存在的文件路径，不存在时返回None
+        """
+        for compression in (None, *self.COMPRESSION_EXTENSIONS):
+            filepath = self._get_output_path(filename, compression)
+            if os.path.exists(filepath):
+                return filepath
+        return None
+    
+    @staticmethod
+    def _open_binary(filepath: str):
+        """
+        按扩展名以二进制方式打开（必要时解压）导出文件
+        
+        Args:
+            filepath: 文件路径
+            
+        Returns:
+            二进制文件对象
+        """
+        if filepath.endswith('.gz'):
+            return gzip.open(filepath, 'rb')
+        if filepath.endswith('.zst'):
+            if pa is not None:
+                return pa.input_stream(filepath, compression='zstd')
+            import zstandard
+            return zstandard.open(filepath, 'rb')
+        return open(filepath, 'rb')
+    
+    @classmethod
+    def _count_lines(cls, filepath: str, buffer_size: int = 1 << 20) -> int:
+        """
+        以二进制分块读取统计文件行数，避免逐行解码
+        
+        Args:
+            filepath: 文件路径
+            buffer_size: 每次读取的字节数
+            
+        Returns:
+            int: 换行符数量
+        """
+        count = 0
+        with cls._open_binary(filepath) as f:
+            while chunk := f.read(buffer_size):
+                count += chunk.count(b'\n')
+        return count
+    
     def get_export_summary(self) -> dict:
         """获取导出文件的摘要信息
         
@@ -283,16 +611,14 @@ class CSVExporter:
             'files': []
         }
         
-        expected_files = ['states.csv', 'cities.csv', 'state_names.csv', 'city_names.csv', 'csc_mapping.csv']
-        
-        for filename in expected_files:
-            filepath = os.path.join(self.output_dir, filename)
-            if os.path.exists(filepath):
+        for filename in self.EXPORT_FILES:
+            filepath = self._find_export_file(filename)
+            if filepath is not None:
+                filename = os.path.basename(filepath)
                 file_size = os.path.getsize(filepath)
                 # 简单计算行数（减去表头）
                 try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        line_count = sum(1 for _ in f) - 1  # 减去表头
+                    line_count = self._count_lines(filepath) - 1  # 减去表头
                 except:
                     line_count = 'unknown'
                 
@@ -319,22 +645,25 @@ class CSVExporter:
             bool: 验证是否通过
         """
         try:
-            expected_files = ['states.csv', 'cities.csv', 'state_names.csv', 'city_names.csv', 'csc_mapping.csv']
-            
-            for filename in expected_files:
-                filepath = os.path.join(self.output_dir, filename)
+            for filename in self.EXPORT_FILES:
+                filepath = self._find_export_file(filename)
                 
-                if not os.path.exists(filepath):
+                if filepath is None:
                     self.logger.error(f"缺少文件: {filename}")
                     return False
+                filename = os.path.basename(filepath)
                 
-                # 验证文件可以正常读取
+                # 用csv模块探测表头和首条记录可以正常解析，记录数通过统计行数获得，避免完整读取整个文件
                 try:
-                    df = pd.read_csv(filepath, encoding='utf-8')
-                    if df.empty:
+                    with io.TextIOWrapper(self._open_binary(filepath), encoding='utf-8', newline='') as f:
+                        reader = csv.reader(f)
+                        header = next(reader, None)
+                        first_row = next(reader, None)
+                    if header is None or first_row is None:
                         self.logger.warning(f"文件为空: {filename}")
                     else:
-                        self.logger.info(f"验证通过: {filename} ({len(df)}条记录)")
+                        record_count = self._count_lines(filepath) - 1  # 减去表头
+                        self.logger.info(f"验证通过: {filename} ({record_count}条记录，{len(header)}个字段)")
                 except Exception as e:
                     self.logger.error(f"文件读取失败: {filename} - {e}")
                     return False
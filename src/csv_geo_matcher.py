@@ -5,16 +5,49 @@ CSV地理匹配处理器模块
 实现CSV数据与GeoNames数据库的地理匹配功能
 """
 
+import io
 import os
+import json
 import logging
+import string
+from collections import Counter
+from itertools import repeat
+import numpy as np
 import pandas as pd
 from typing import Dict, List, Tuple, Any, Optional
 
 from sqlalchemy.orm import state
 from sqlite_integrator import SQLiteIntegrator
 
+# 安装了pyarrow时使用其多线程CSV解析器读取输入文件，否则回退到pandas的C解析器；
+# 导出前清理Arrow字符串列时也直接使用其计算函数
+try:
+    import pyarrow
+    import pyarrow.compute as pc
+except ImportError:
+    pyarrow = None
+    pc = None
+
+# 安装了orjson时用其写JSON报告（原生支持numpy类型），否则回退到标准库json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# 与SQLite的COLLATE NOCASE一致，只折叠ASCII字母的大小写
+_NOCASE_TABLE = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+# 失败记录按元组存储，导出时按以下字段名构建DataFrame
+_FAILED_RECORD_COLUMNS = ('country_code', 'state_name', 'city_name', 'state_geonameid',
+                          'failure_type', 'failure_reason', 'suggestion')
+_CITY_NOT_FOUND_SUGGESTION = '检查城市名拼写，或确认该城市在指定州内存在'
+
+# 导出前将字符串中的换行符、回车符、制表符替换为空格
+_EXPORT_CLEAN_TABLE = str.maketrans({'\n': ' ', '\r': ' ', '\t': ' '})
+_EXPORT_CLEAN_PATTERN = r'[\n\r\t]'
+
 class CSVGeoMatcher:
     """
     CSV地理匹配处理器
@@ -64,13 +97,13 @@ class CSVGeoMatcher:
                 'multiple_matches': 0,
                 'no_matches': 0,
                 'failed_countries': set(),
-                'failed_states': set()
+                'failed_states': Counter()  # (country_code, state_name) -> 失败次数
             },
             'city_match_details': {
                 'exact_matches': 0,
                 'multiple_matches': 0,
                 'no_matches': 0,
-                'failed_cities': set()
+                'failed_cities': Counter()  # (state_geonameid, city_name) -> 失败次数
             },
             'data_quality_issues': {
                 'empty_country_codes': 0,
@@ -86,6 +119,14 @@ class CSVGeoMatcher:
             }
         }
         
+        # 内存查找表（首次匹配时从state_names/city_names一次性加载）
+        self._state_index = None
+        self._city_by_admin1 = None
+        self._city_by_country = None
+        self._state_table = None
+        self._city_by_admin1_table = None
+        self._city_by_country_table = None
+        
         # 数据存储
         self.df = None
         self.match_results = []
@@ -128,6 +169,78 @@ class CSVGeoMatcher:
         except Exception as e:
             raise RuntimeError(f"数据库连接初始化失败:", exc_info=True)
     
+    def _load_lookup_tables(self) -> None:
+        """
+        一次性加载state_names/city_names到内存查找表，匹配时不再逐条查询数据库
+        
+        键统一按COLLATE NOCASE的规则转为小写，按人口降序加载，
+        同一个键只保留第一条记录，即人口最多的匹配结果。
+        同时生成用于批量merge的DataFrame和用于单条匹配的字典
+        """
+        engine = self.sqlite_integrator.get_engine()
+        
+        # 州名查找表: (country_code, name) -> (geonameid, admin1_code)
+        states = pd.read_sql_query("""
+            SELECT sn.country_code, sn.name, sn.geonameid, sn.admin1_code
+            FROM state_names sn
+            JOIN states s ON sn.geonameid = s.geonameid
+            ORDER BY s.population DESC
+        """, engine)
+        states['_cc'] = states['country_code'].str.translate(_NOCASE_TABLE)
+        states['_st'] = states['name'].str.translate(_NOCASE_TABLE)
+        states = states.drop_duplicates(['_cc', '_st'])
+        
+        # 城市名查找表: (country_code, admin1_code, name) -> geonameid
+        # 以及按国家回退的查找表: (country_code, name) -> (geonameid, 是否有多个匹配)
+        cities = pd.read_sql_query("""
+            SELECT cn.country_code, cn.admin1_code, cn.name, cn.geonameid
+            FROM city_names cn
+            JOIN cities c ON cn.geonameid = c.geonameid
+            ORDER BY c.population DESC
+        """, engine)
+        cities['_cc'] = cities['country_code'].str.translate(_NOCASE_TABLE)
+        cities['_ci'] = cities['name'].str.translate(_NOCASE_TABLE)
+        cities['multiple'] = cities.duplicated(['_cc', '_ci'], keep=False)
+        city_by_admin1 = cities.drop_duplicates(['_cc', 'admin1_code', '_ci'])
+        city_by_country = cities.drop_duplicates(['_cc', '_ci'])
+        
+        self.detailed_stats['performance_metrics']['database_query_count'] += 2
+        
+        # 批量匹配使用的查找表（geonameid使用可空整数类型，merge后未匹配的行为NA而不是转成float）
+        self._state_table = pd.DataFrame({
+            '_cc': states['_cc'],
+            '_st': states['_st'],
+            'state_geonameid': states['geonameid'].astype('Int64'),
+            'state_admin1_code': states['admin1_code']
+        })
+        self._city_by_admin1_table = pd.DataFrame({
+            '_cc': city_by_admin1['_cc'],
+            'admin1_code': city_by_admin1['admin1_code'],
+            '_ci': city_by_admin1['_ci'],
+            'city_geonameid': city_by_admin1['geonameid'].astype('Int64')
+        })
+        self._city_by_country_table = pd.DataFrame({
+            '_cc': city_by_country['_cc'],
+            '_ci': city_by_country['_ci'],
+            'country_city_geonameid': city_by_country['geonameid'].astype('Int64'),
+            'multiple': city_by_country['multiple']
+        })
+        
+        # 单条匹配使用的字典
+        self._state_index = dict(zip(
+            zip(states['_cc'], states['_st']),
+            zip(states['geonameid'].tolist(), states['admin1_code'])
+        ))
+        self._city_by_admin1 = dict(zip(
+            zip(city_by_admin1['_cc'], city_by_admin1['admin1_code'], city_by_admin1['_ci']),
+            city_by_admin1['geonameid'].tolist()
+        ))
+        self._city_by_country = dict(zip(
+            zip(city_by_country['_cc'], city_by_country['_ci']),
+            zip(city_by_country['geonameid'].tolist(), city_by_country['multiple'].tolist())
+        ))
+        logger.info(f"查找表加载完成: {len(self._state_index)} 个州名, {len(self._city_by_admin1)} 个城市名")
+    
     def load_csv_data(self) -> pd.DataFrame:
         """
         读取CSV文件并应用列名映射
@@ -138,8 +251,22 @@ class CSVGeoMatcher:
         try:
             logger.info(f"开始读取CSV文件: {self.input_csv}")
             
-            # 读取CSV文件
-            self.df = pd.read_csv(self.input_csv)
+            # 读取CSV文件（仍使用numpy类型，后续按object列清理导出数据）
+            self.df = None
+            if pyarrow is not None:
+                try:
+                    self.df = pd.read_csv(self.input_csv, engine='pyarrow')
+                except pd.errors.ParserError as e:
+                    # pyarrow解析器不接受列数不一致的行，回退到C解析器（缺少的字段填充为空值）
+                    logger.warning(f"pyarrow解析CSV失败，回退到默认解析器: {e}")
+                else:
+                    # pyarrow会把日期/时间文本解析为时间类型，导出时格式会被改写；
+                    # 为保持原始数据不变，存在这类列时改用C解析器按原文读取
+                    if self._has_temporal_columns(self.df):
+                        logger.info("CSV包含日期/时间列，改用默认解析器以保留原始文本")
+                        self.df = None
+            if self.df is None:
+                self.df = pd.read_csv(self.input_csv)
             logger.info(f"成功读取CSV文件，共 {len(self.df)} 行数据")
             
             # 验证必需列是否存在
@@ -170,6 +297,25 @@ class CSVGeoMatcher:
             logger.error(f"CSV数据加载失败:", exc_info=True)
             raise
     
+    @staticmethod
+    def _has_temporal_columns(df: pd.DataFrame) -> bool:
+        """
+        检查DataFrame中是否有被解析为日期/时间类型的列
+        
+        Args:
+            df (pd.DataFrame): 要检查的DataFrame
+            
+        Returns:
+            bool: 是否存在日期/时间列
+        """
+        for col, dtype in df.dtypes.items():
+            if dtype.kind in 'mM':
+                return True
+            # date32/time类型转换为pandas后是保存datetime.date/datetime.time对象的object列
+            if dtype == object and pd.api.types.infer_dtype(df[col], skipna=True) in ('date', 'time', 'datetime'):
+                return True
+        return False
+    
     def _clean_and_validate_data(self) -> None:
         """
         清理和验证数据
@@ -178,15 +324,15 @@ class CSVGeoMatcher:
         
         # 移除空值记录
         required_columns = [v for k, v in self.column_mapping.items() if k in ['country_code', 'state_name', 'city_name']]
-        self.df = self.df.dropna(subset=required_columns)
         
         # 数据类型转换和清理
-        for col in required_columns:
-            self.df[col] = self.df[col].astype(str).str.strip()
+        cleaned = {col: self.df[col].astype(str).str.strip() for col in required_columns}
         
-        # 移除空字符串记录
-        for col in required_columns:
-            self.df = self.df[self.df[col] != '']
+        # 合并为一个掩码一次性移除空值和空字符串记录，避免逐列过滤时反复复制整个DataFrame
+        mask = np.logical_and.reduce([
+            self.df[col].notna().to_numpy() & (cleaned[col] != '').to_numpy() for col in required_columns
+        ])
+        self.df = self.df.loc[mask].assign(**cleaned)
         
         # 统计数据验证错误
         self.stats['data_validation_errors'] = initial_count - len(self.df)
@@ -255,60 +401,36 @@ class CSVGeoMatcher:
         通过country_code和state_name匹配state geonameid
         
         Args:
-            country_code (str): 国家代码
-            state_name (str): 州/省名称
+            country_code (str): 国家代码（已去除首尾空白）
+            state_name (str): 州/省名称（已去除首尾空白）
             
         Returns:
             Optional[int]: 匹配到的state geonameid，如果没有匹配则返回None
         """
         try:
-            # 数据质量检查
-            if not country_code or not country_code.strip():
+            # 数据质量检查（输入已去除首尾空白）
+            if not country_code:
                 self.detailed_stats['data_quality_issues']['empty_country_codes'] += 1
                 return None
             
-            if not state_name or not state_name.strip():
+            if not state_name:
                 self.detailed_stats['data_quality_issues']['empty_state_names'] += 1
                 return None
             
-            conn = self.sqlite_integrator.get_connection()
-            cursor = conn.cursor()
+            if self._state_index is None:
+                self._load_lookup_tables()
             
-            # 统计数据库查询次数
-            self.detailed_stats['performance_metrics']['database_query_count'] += 1
+            # 大小写不敏感的查找，查找表中已保留人口最多的匹配结果
+            result = self._state_index.get((country_code.translate(_NOCASE_TABLE), state_name.translate(_NOCASE_TABLE)))
             
-            # 使用大小写不敏感的查询
-            query = """
-                SELECT sn.geonameid, s.population, sn.admin1_code 
-                FROM state_names sn 
-                JOIN states s ON sn.geonameid = s.geonameid 
-                WHERE sn.country_code = ? COLLATE NOCASE 
-                AND sn.name = ? COLLATE NOCASE
-                ORDER BY s.population DESC
-                LIMIT 1
-            """
-            
-            cursor.execute(query, (country_code, state_name))
-            results = cursor.fetchall()
-            
-            if results:
-                # 如果有多个匹配结果，选择人口最多的
-                best_match = results[0]
-                state_geonameid = best_match[0]
-                state_admin1_code = best_match[2]
-                
-                if len(results) == 1:
-                    self.detailed_stats['state_match_details']['exact_matches'] += 1
-                else:
-                    self.detailed_stats['state_match_details']['multiple_matches'] += 1
-                    logger.debug(f"州名匹配找到多个结果，选择人口最多的: {country_code}/{state_name} -> {state_geonameid}")
-                
-                return state_geonameid, state_admin1_code
+            if result is not None:
+                self.detailed_stats['state_match_details']['exact_matches'] += 1
+                return result
             else:
                 self.detailed_stats['state_match_details']['no_matches'] += 1
                 self.detailed_stats['state_match_details']['failed_countries'].add(country_code)
-                self.detailed_stats['state_match_details']['failed_states'].add(f"{country_code}:{state_name}")
-                logger.debug(f"州名匹配失败: {country_code}/{state_name}")
+                self.detailed_stats['state_match_details']['failed_states'][(country_code, state_name)] += 1
+                logger.debug("州名匹配失败: %s/%s", country_code, state_name)
                 return None
                 
         except Exception as e:
@@ -321,81 +443,45 @@ class CSVGeoMatcher:
         
         Args:
             state_geonameid (int): 州的geonameid
-            city_name (str): 城市名称
+            city_name (str): 城市名称（已去除首尾空白）
             
         Returns:
             Optional[int]: 匹配到的city geonameid，如果没有匹配则返回None
         """
         try:
-            # 数据质量检查
-            if not city_name or not city_name.strip():
+            # 数据质量检查（输入已去除首尾空白）
+            if not city_name:
                 self.detailed_stats['data_quality_issues']['empty_city_names'] += 1
                 return None
             
-            conn = self.sqlite_integrator.get_connection()
-            cursor = conn.cursor()
+            if self._city_by_admin1 is None:
+                self._load_lookup_tables()
             
-            # 统计数据库查询次数
-            self.detailed_stats['performance_metrics']['database_query_count'] += 1
-            
-            # 使用大小写不敏感的查询，按人口降序排序
-            results = []
-            if False:
-                query = """
-                    SELECT cn.geonameid, c.population 
-                    FROM city_names cn 
-                    JOIN cities c ON cn.geonameid = c.geonameid 
-                    WHERE cn.country_code = ? COLLATE NOCASE
-                    AND cn.state_geonameid = ? 
-                    AND cn.name = ? COLLATE NOCASE
-                    ORDER BY c.population DESC
-                    LIMIT 1
-                """
-                cursor.execute(query, (country_code, state_geonameid, city_name))
-                results = cursor.fetchall()
-            elif state_geonameid is not None or state_admin1_code is not None:
-                query = """
-                    SELECT cn.geonameid, c.population 
-                    FROM city_names cn 
-                    JOIN cities c ON cn.geonameid = c.geonameid 
-                    WHERE cn.country_code = ? COLLATE NOCASE
-                    AND cn.admin1_code = ? 
-                    AND cn.name = ? COLLATE NOCASE
-                    ORDER BY c.population DESC
-                    LIMIT 1
-                """
-                cursor.execute(query, (country_code, state_admin1_code, city_name))
-                results = cursor.fetchall()
-            if not results:
-                query = """
-                    SELECT cn.geonameid, c.population 
-                    FROM city_names cn 
-                    JOIN cities c ON cn.geonameid = c.geonameid 
-                    WHERE cn.country_code = ? COLLATE NOCASE
-                    AND cn.name = ? COLLATE NOCASE
-                    ORDER BY c.population DESC
-                    LIMIT 2
-                """
-                cursor.execute(query, (country_code, city_name))
-                results = cursor.fetchall()
-
+            # 大小写不敏感的查找，查找表中已保留人口最多的匹配结果
+            country_code = country_code.translate(_NOCASE_TABLE)
+            city_key = city_name.translate(_NOCASE_TABLE)
+            city_geonameid = None
+            multiple = False
+            if state_geonameid is not None or state_admin1_code is not None:
+                city_geonameid = self._city_by_admin1.get((country_code, state_admin1_code, city_key))
+            if city_geonameid is None:
+                # 在州内找不到时，回退到整个国家范围内查找
+                result = self._city_by_country.get((country_code, city_key))
+                if result is not None:
+                    city_geonameid, multiple = result
             
-            if results:
-                # 选择人口最多的城市
-                best_match = results[0]
-                city_geonameid = best_match[0]
-                
-                if len(results) == 1:
+            if city_geonameid is not None:
+                if not multiple:
                     self.detailed_stats['city_match_details']['exact_matches'] += 1
                 else:
                     self.detailed_stats['city_match_details']['multiple_matches'] += 1
-                    logger.debug(f"城市名匹配找到多个结果，选择人口最多的: {state_geonameid}/{city_name} -> {city_geonameid}")
+                    logger.debug("城市名匹配找到多个结果，选择人口最多的: %s/%s -> %s", state_geonameid, city_name, city_geonameid)
                 
                 return city_geonameid
             else:
                 self.detailed_stats['city_match_details']['no_matches'] += 1
-                self.detailed_stats['city_match_details']['failed_cities'].add(f"{state_geonameid}:{city_name}")
-                logger.debug(f"城市名匹配失败: {state_geonameid}/{city_name}")
+                self.detailed_stats['city_match_details']['failed_cities'][(state_geonameid, city_name)] += 1
+                logger.debug("城市名匹配失败: %s/%s", state_geonameid, city_name)
                 return None
                 
         except Exception as e:
@@ -414,6 +500,11 @@ class CSVGeoMatcher:
         Returns:
             Tuple[Optional[int], Dict[str, Any]]: (匹配到的geonameid, 匹配详情)
         """
+        # 统一在入口去除一次首尾空白，match_state/match_city不再重复处理
+        country_code = country_code.strip()
+        state_name = state_name.strip()
+        city_name = city_name.strip()
+        
         match_details = {
             'country_code': country_code,
             'state_name': state_name,
@@ -457,17 +548,12 @@ class CSVGeoMatcher:
             if city_geonameid is None:
                 match_details['failure_reason'] = 'city_not_found'
                 self.stats['city_match_failures'] += 1
-                logger.info(f"无法找到匹配的城市: {country_code}/{state_name}({state_admin1_code})/{city_name}")
+                logger.info("无法找到匹配的城市: %s/%s(%s)/%s", country_code, state_name, state_admin1_code, city_name)
                 # 添加到失败记录
-                self.failed_records.append({
-                    'country_code': country_code,
-                    'state_name': state_name,
-                    'city_name': city_name,
-                    'state_geonameid': state_geonameid,
-                    'failure_type': 'city_not_found',
-                    'failure_reason': f'无法找到匹配的城市: {city_name} (在州 {state_geonameid})',
-                    'suggestion': '检查城市名拼写，或确认该城市在指定州内存在'
-                })
+                self.failed_records.append((
+                    country_code, state_name, city_name, state_geonameid, 'city_not_found',
+                    f'无法找到匹配的城市: {city_name} (在州 {state_geonameid})', _CITY_NOT_FOUND_SUGGESTION
+                ))
                 return None, match_details
             
             match_details['city_geonameid'] = city_geonameid
@@ -507,41 +593,106 @@ class CSVGeoMatcher:
         self.stats['state_match_failures'] = 0
         self.stats['city_match_failures'] = 0
         
-        # 存储匹配详情
-        self.match_results = []
+        if self._state_table is None:
+            self._load_lookup_tables()
+        
+        # 一次性规范化输入列（去除首尾空白，按NOCASE规则转为小写作为查找键）
+        country_codes = df[self.column_mapping['country_code']].astype(str).str.strip()
+        state_names = df[self.column_mapping['state_name']].astype(str).str.strip()
+        city_names = df[self.column_mapping['city_name']].astype(str).str.strip()
+        keys = pd.DataFrame({
+            '_cc': country_codes.str.translate(_NOCASE_TABLE).to_numpy(),
+            '_st': state_names.str.translate(_NOCASE_TABLE).to_numpy(),
+            '_ci': city_names.str.translate(_NOCASE_TABLE).to_numpy()
+        })
+        country_codes = country_codes.to_numpy()
+        state_names = state_names.to_numpy()
+        city_names = city_names.to_numpy()
+        
+        # 相同的(国家, 州, 城市)组合只匹配一次，匹配后再按组号映射回每一行
+        group_ids = keys.groupby(['_cc', '_st', '_ci'], sort=False, dropna=False).ngroup().to_numpy()
+        unique_keys = keys.drop_duplicates(ignore_index=True)
+        has_country = keys['_cc'].to_numpy() != ''
+        valid_state = has_country & (keys['_st'].to_numpy() != '')
+        
+        # 第一步：匹配州（左连接保持输入行顺序，查找表每个键只有一行，行数不变）
+        matched = unique_keys.merge(self._state_table, on=['_cc', '_st'], how='left')
+        unique_state_found = ((unique_keys['_cc'] != '') & (unique_keys['_st'] != '')
+                              & matched['state_geonameid'].notna()).to_numpy()
+        
+        # 第二步：匹配城市，先在匹配到的州内查找，找不到时回退到整个国家范围
+        matched['admin1_code'] = matched['state_admin1_code'].where(unique_state_found)
+        matched = matched.merge(self._city_by_admin1_table, on=['_cc', 'admin1_code', '_ci'], how='left')
+        matched = matched.merge(self._city_by_country_table, on=['_cc', '_ci'], how='left')
+        matched = matched.take(group_ids).reset_index(drop=True)
+        state_found = unique_state_found[group_ids]
+        in_state = matched['city_geonameid'].notna().to_numpy()
+        city_geonameids = matched['city_geonameid'].where(in_state, matched['country_city_geonameid'])
+        multiple = ~in_state & matched['multiple'].eq(True).to_numpy()
+        valid_city = keys['_ci'].to_numpy() != ''
+        city_found = valid_city & city_geonameids.notna().to_numpy()
+        state_failed = valid_state & ~state_found
+        city_failed = ~city_found
+        
+        # 更新数据质量与匹配统计
+        quality = self.detailed_stats['data_quality_issues']
+        quality['empty_country_codes'] += int((~has_country).sum())
+        quality['empty_state_names'] += int((has_country & ~valid_state).sum())
+        quality['empty_city_names'] += int((~valid_city).sum())
+        
+        state_details = self.detailed_stats['state_match_details']
+        state_details['exact_matches'] += int(state_found.sum())
+        state_details['no_matches'] += int(state_failed.sum())
+        state_details['failed_countries'].update(country_codes[state_failed])
+        state_details['failed_states'].update(zip(country_codes[state_failed], state_names[state_failed]))
+        
+        city_details = self.detailed_stats['city_match_details']
+        city_details['exact_matches'] += int((city_found & ~multiple).sum())
+        city_details['multiple_matches'] += int((city_found & multiple).sum())
+        city_details['no_matches'] += int((valid_city & city_failed).sum())
+        
+        self.stats['successful_matches'] += int(city_found.sum())
+        self.stats['city_match_failures'] += int(city_failed.sum())
+        
+        # 写回结果列
+        state_geonameids = matched['state_geonameid'].to_numpy(dtype=object, na_value=None)
+        state_geonameids[~state_found] = None
+        geonameids = city_geonameids.to_numpy(dtype=object, na_value=None)
+        geonameids[city_failed] = None
+        df['geonameid'] = geonameids
+        
+        # 记录失败详情
+        failed_states = state_geonameids[valid_city & city_failed]
+        failed_cities = city_names[valid_city & city_failed]
+        city_details['failed_cities'].update(zip(failed_states, failed_cities))
+        failed_country_codes = country_codes[city_failed]
+        failed_state_names = state_names[city_failed]
+        failed_city_names = city_names[city_failed]
+        failed_state_geonameids = state_geonameids[city_failed]
+        # 日志被屏蔽时不逐条构造消息
+        if logger.isEnabledFor(logging.INFO):
+            for cc, st, ci, admin1 in zip(failed_country_codes, failed_state_names, failed_city_names,
+                                          matched['admin1_code'].to_numpy()[city_failed]):
+                logger.info("无法找到匹配的城市: %s/%s(%s)/%s", cc, st, None if pd.isna(admin1) else admin1, ci)
+        failure_reasons = [f'无法找到匹配的城市: {ci} (在州 {sg})'
+                           for ci, sg in zip(failed_city_names, failed_state_geonameids)]
+        self.failed_records.extend(zip(
+            failed_country_codes, failed_state_names, failed_city_names, failed_state_geonameids,
+            repeat('city_not_found'), failure_reasons, repeat(_CITY_NOT_FOUND_SUGGESTION)
+        ))
         
-        succ = 0
-        def worker(rr):
-            index, row = rr
-            country_code = str(row[self.column_mapping['country_code']]).strip()
-            state_name = str(row[self.column_mapping['state_name']]).strip()
-            city_name = str(row[self.column_mapping['city_name']]).strip()
-            
-            # 执行匹配
-            geonameid, match_details = self.match_geography_single(country_code, state_name, city_name)
-            
-            # 更新DataFrame
-            df.at[index, 'geonameid'] = geonameid
-            if geonameid:
-                nonlocal succ
-                succ += 1
-            
-            # 保存匹配详情
-            match_details['row_index'] = index
-            self.match_results.append(match_details)
-            
-        # 批量处理
-        # for rr in df.iterrows():
-        #     worker(rr)
-        #     # 进度日志
-        #     if (index + 1) % 1000 == 0:
-        #         logger.info(f"已处理 {index + 1}/{len(df)} 条记录, 成功 {succ} 条")
-        from multiprocessing.pool import ThreadPool
-        pool = ThreadPool(5)
-        for index, _ in enumerate(pool.imap_unordered(worker, df.iterrows())):
-            # 进度日志
-            if (index + 1) % 1000 == 0:
-                logger.info(f"已处理 {index + 1}/{len(df)} 条记录, 成功 {succ} 条")
+        # 存储匹配详情
+        self.match_results = pd.DataFrame({
+            'country_code': country_codes,
+            'state_name': state_names,
+            'city_name': city_names,
+            'state_geonameid': state_geonameids,
+            'state_admin1_code': matched['admin1_code'].to_numpy(),
+            'city_geonameid': geonameids,
+            'match_status': np.where(city_found, 'success', 'failed'),
+            'failure_reason': np.where(city_found, None, 'city_not_found'),
+            'row_index': df.index
+        })
         
         # 更新处理时间
         self.stats['processing_time'] = time.time() - start_time
@@ -591,14 +742,16 @@ class CSVGeoMatcher:
                 'failed_countries_count': len(self.detailed_stats['state_match_details']['failed_countries']),
                 'failed_countries': list(self.detailed_stats['state_match_details']['failed_countries']),
                 'failed_states_count': len(self.detailed_stats['state_match_details']['failed_states']),
-                'top_failed_states': list(self.detailed_stats['state_match_details']['failed_states'])[:10]
+                'top_failed_states': [f"{country_code}:{state_name}" for (country_code, state_name), _ in
+                                      self.detailed_stats['state_match_details']['failed_states'].most_common(10)]
             },
             'city_match_analysis': {
                 'exact_matches': self.detailed_stats['city_match_details']['exact_matches'],
                 'multiple_matches': self.detailed_stats['city_match_details']['multiple_matches'],
                 'no_matches': self.detailed_stats['city_match_details']['no_matches'],
                 'failed_cities_count': len(self.detailed_stats['city_match_details']['failed_cities']),
-                'top_failed_cities': list(self.detailed_stats['city_match_details']['failed_cities'])[:10]
+                'top_failed_cities': [f"{state_geonameid}:{city_name}" for (state_geonameid, city_name), _ in
+                                      self.detailed_stats['city_match_details']['failed_cities'].most_common(10)]
             },
             'data_quality_analysis': {
                 'empty_country_codes': self.detailed_stats['data_quality_issues']['empty_country_codes'],
@@ -694,7 +847,7 @@ class CSVGeoMatcher:
             os.makedirs(output_dir, exist_ok=True)
         
         # 转换为DataFrame并保存
-        failed_df = pd.DataFrame(self.failed_records)
+        failed_df = pd.DataFrame(self.failed_records, columns=_FAILED_RECORD_COLUMNS)
         failed_df.to_csv(output_file, index=False, encoding='utf-8')
         
         logger.info(f"失败记录已导出到: {output_file}")
@@ -793,11 +946,46 @@ class CSVGeoMatcher:
                 'data_types': df.dtypes.astype(str).to_dict()
             },
             'column_info': column_info,
-            'file_size_estimate': df.memory_usage(deep=True).sum()  # 字节
+            'file_size_estimate': self._estimate_memory(df)  # 字节
         }
         
         return summary
     
+    @staticmethod
+    def _estimate_memory(df: pd.DataFrame, sample_size: int = 1000) -> int:
+        """
+        估算DataFrame占用的内存字节数，避免memory_usage(deep=True)逐个遍历全部字符串对象
+        
+        定长的numpy列按itemsize×行数计算；字符串等变长列只对前sample_size行做深度统计，
+        再按行数比例放大
+        
+        Args:
+            df (pd.DataFrame): 要估算的DataFrame
+            sample_size (int): 变长列的采样行数
+            
+        Returns:
+            int: 估算的字节数
+        """
+        total_rows = len(df)
+        
+        # 按dtype聚合列数，宽表时不必逐列遍历
+        dtype_counts = df.dtypes.value_counts()
+        fixed_size = 0
+        variable_dtypes = []
+        for dtype, count in dtype_counts.items():
+            if isinstance(dtype, np.dtype) and dtype != object:
+                fixed_size += dtype.itemsize * count
+            else:
+                variable_dtypes.append(dtype)
+        variable_columns = df.columns[df.dtypes.isin(variable_dtypes)] if variable_dtypes else []
+        
+        estimate = fixed_size * total_rows + df.index.memory_usage()
+        if len(variable_columns) > 0 and total_rows > 0:
+            sample = df[variable_columns].head(sample_size)
+            sample_bytes = sample.memory_usage(index=False, deep=True).sum()
+            estimate += sample_bytes * total_rows / len(sample)
+        return int(estimate)
+    
     def _prepare_export_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         准备导出数据，保持原始列的顺序，在末尾添加geonameid列
@@ -808,29 +996,47 @@ class CSVGeoMatcher:
         Returns:
             pd.DataFrame: 准备好的导出DataFrame
         """
-        export_df = df.copy()
         # export_df = export_df.rename(columns={k:v for k,v in self.column_mapping.items()})
         
-        # 确保geonameid列在最后
-        if 'geonameid' in export_df.columns:
+        # 确保geonameid列在最后（顺序已正确时直接使用原数据，不复制整个DataFrame）
+        export_df = df
+        if 'geonameid' in df.columns and df.columns[-1] != 'geonameid':
             # 重新排列列顺序：原始列 + geonameid
-            original_columns = [col for col in export_df.columns if col != 'geonameid']
-            new_column_order = original_columns + ['geonameid']
-            export_df = export_df[new_column_order]
-        
-        # 处理特殊字符和数据类型
-        for col in export_df.columns:
-            if export_df[col].dtype == 'object':
-                # 处理字符串列中的特殊字符
-                export_df[col] = export_df[col].astype(str).replace({
-                    '\n': ' ',  # 替换换行符
-                    '\r': ' ',  # 替换回车符
-                    '\t': ' ',  # 替换制表符
-                    '"': '""'   # 转义双引号
-                })
+            original_columns = [col for col in df.columns if col != 'geonameid']
+            export_df = df[original_columns + ['geonameid']]
+        
+        # 处理特殊字符和数据类型（按子串整列替换；双引号由写出CSV时的引号规则转义，无需预先处理）
+        # 清理后的列通过assign生成新的DataFrame，不修改传入的数据
+        cleaned = {}
+        for col, dtype in export_df.dtypes.items():
+            if dtype == 'object':
+                cleaned[col] = self._clean_export_strings(export_df[col].astype(str))
+            elif isinstance(dtype, pd.StringDtype):
+                cleaned[col] = self._clean_export_strings(export_df[col])
+        if cleaned:
+            export_df = export_df.assign(**cleaned)
         
         return export_df
     
+    @staticmethod
+    def _clean_export_strings(series: pd.Series) -> pd.Series:
+        """
+        将字符串列中的换行符、回车符、制表符替换为空格
+        
+        Arrow存储的字符串列直接在Arrow缓冲区上整列替换，其余情况逐个字符串translate
+        
+        Args:
+            series (pd.Series): 字符串列
+            
+        Returns:
+            pd.Series: 清理后的字符串列
+        """
+        dtype = series.dtype
+        if pc is not None and isinstance(dtype, pd.StringDtype) and dtype.storage == 'pyarrow':
+            replaced = pc.replace_substring_regex(pyarrow.array(series), _EXPORT_CLEAN_PATTERN, ' ')
+            return pd.Series(pd.array(replaced, dtype=dtype), index=series.index, name=series.name)
+        return series.str.translate(_EXPORT_CLEAN_TABLE)
+    
     def _save_export_summary(self, summary: Dict[str, Any], output_file: str) -> str:
         """
         保存导出摘要信息
@@ -842,9 +1048,6 @@ class CSVGeoMatcher:
         Returns:
             str: 摘要文件路径
         """
-        import json
-        import numpy as np
-        
         # 生成摘要文件路径
         base_name = os.path.splitext(os.path.basename(output_file))[0]
         summary_file = os.path.join(os.path.dirname(output_file), f"{base_name}_export_summary.json")
@@ -853,7 +1056,29 @@ class CSVGeoMatcher:
         summary['output_file'] = output_file
         summary['summary_file'] = summary_file
         
-        # 转换numpy类型为Python原生类型
+        # 保存摘要
+        self._write_json(summary, summary_file)
+        
+        return summary_file
+    
+    @staticmethod
+    def _write_json(data: Any, output_file: str) -> None:
+        """
+        将数据以缩进JSON格式写入文件，numpy类型直接序列化为Python原生类型
+        
+        Args:
+            data (Any): 待写入的数据
+            output_file (str): 输出文件路径
+        """
+        if orjson is not None:
+            with open(output_file, 'wb') as f:
+                f.write(orjson.dumps(
+                    data,
+                    option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+                ))
+            return
+        
+        # 标准库json只在遇到无法序列化的对象时才回调，无需预先遍历整棵数据树
         def convert_numpy_types(obj):
             if isinstance(obj, np.integer):
                 return int(obj)
@@ -861,20 +1086,10 @@ class CSVGeoMatcher:
                 return float(obj)
             elif isinstance(obj, np.ndarray):
                 return obj.tolist()
-            elif isinstance(obj, dict):
-                return {k: convert_numpy_types(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [convert_numpy_types(item) for item in obj]
-            return obj
-        
-        # 转换摘要数据
-        summary_converted = convert_numpy_types(summary)
+            raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
         
-        # 保存摘要
-        with open(summary_file, 'w', encoding='utf-8') as f:
-            json.dump(summary_converted, f, ensure_ascii=False, indent=2)
-        
-        return summary_file
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2, default=convert_numpy_types)
     
     def create_output_summary(self, df: pd.DataFrame) -> Dict[str, Any]:
         """
@@ -906,19 +1121,22 @@ class CSVGeoMatcher:
             logger.error(f"导出结果失败:", exc_info=True)
             return False
     
-    def save_match_report(self, output_file: str = None, format_type: str = 'txt') -> str:
+    def save_match_report(self, output_file: str = None, format_type: str = 'txt',
+                          detailed_report: Dict[str, Any] = None) -> str:
         """
         保存详细的匹配统计报告到文件
         
         Args:
             output_file (str, optional): 输出文件路径
             format_type (str): 报告格式 ('txt' 或 'json')
+            detailed_report (Dict[str, Any], optional): 已生成的详细报告，为None时重新生成
             
         Returns:
             str: 报告文件的完整路径
         """
         # 生成详细报告
-        detailed_report = self.generate_detailed_match_report()
+        if detailed_report is None:
+            detailed_report = self.generate_detailed_match_report()
         
         if 'error' in detailed_report:
             logger.warning(detailed_report['error'])
@@ -937,14 +1155,11 @@ class CSVGeoMatcher:
         
         if format_type == 'json':
             # 保存为JSON格式
-            import json
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(detailed_report, f, ensure_ascii=False, indent=2)
+            self._write_json(detailed_report, output_file)
         else:
             # 保存为文本格式
-            report_content = self._format_report_as_text(detailed_report)
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(report_content)
+            with open(output_file, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                self._write_report_as_text(detailed_report, f)
         
         logger.info(f"详细匹配报告已保存到: {output_file}")
         return output_file
@@ -959,9 +1174,21 @@ class CSVGeoMatcher:
         Returns:
             str: 格式化的文本报告
         """
+        buffer = io.StringIO()
+        self._write_report_as_text(report, buffer)
+        return buffer.getvalue()
+    
+    def _write_report_as_text(self, report: Dict[str, Any], f) -> None:
+        """
+        将报告按段落逐段写入文本文件对象，不在内存中拼接完整报告
+        
+        Args:
+            report (Dict[str, Any]): 详细报告数据
+            f: 已打开的文本文件对象
+        """
         from datetime import datetime
         
-        content = f"""地理匹配详细统计报告
+        f.write(f"""地理匹配详细统计报告
 {'='*60}
 
 总体统计:
@@ -980,25 +1207,25 @@ class CSVGeoMatcher:
 - 无匹配: {report['state_match_analysis']['no_matches']:,}
 - 失败国家数: {report['state_match_analysis']['failed_countries_count']}
 - 失败州数: {report['state_match_analysis']['failed_states_count']}
-"""
+""")
         
         if report['state_match_analysis']['failed_countries']:
-            content += f"\n失败的国家代码: {', '.join(report['state_match_analysis']['failed_countries'][:10])}"
+            f.write(f"\n失败的国家代码: {', '.join(report['state_match_analysis']['failed_countries'][:10])}")
             if len(report['state_match_analysis']['failed_countries']) > 10:
-                content += f" (显示前10个，共{len(report['state_match_analysis']['failed_countries'])}个)"
+                f.write(f" (显示前10个，共{len(report['state_match_analysis']['failed_countries'])}个)")
         
-        content += f"""\n\n城市匹配分析:
+        f.write(f"""\n\n城市匹配分析:
 {'-'*30}
 - 精确匹配: {report['city_match_analysis']['exact_matches']:,}
 - 多重匹配: {report['city_match_analysis']['multiple_matches']:,}
 - 无匹配: {report['city_match_analysis']['no_matches']:,}
 - 失败城市数: {report['city_match_analysis']['failed_cities_count']}
-"""
+""")
         
         if report['city_match_analysis']['top_failed_cities']:
-            content += f"\n常见失败城市: {', '.join(report['city_match_analysis']['top_failed_cities'])}"
+            f.write(f"\n常见失败城市: {', '.join(report['city_match_analysis']['top_failed_cities'])}")
         
-        content += f"""\n\n数据质量分析:
+        f.write(f"""\n\n数据质量分析:
 {'-'*30}
 - 空国家代码: {report['data_quality_analysis']['empty_country_codes']:,}
 - 空州名: {report['data_quality_analysis']['empty_state_names']:,}
@@ -1014,14 +1241,11 @@ class CSVGeoMatcher:
 
 改进建议:
 {'-'*30}
-"""
+""")
         
-        for i, recommendation in enumerate(report['recommendations'], 1):
-            content += f"{i}. {recommendation}\n"
+        f.writelines(f"{i}. {recommendation}\n" for i, recommendation in enumerate(report['recommendations'], 1))
         
-        content += f"\n\n报告生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-        
-        return content
+        f.write(f"\n\n报告生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
     
     def process_csv_file(self) -> Dict[str, Any]:
         """
@@ -1045,18 +1269,19 @@ class CSVGeoMatcher:
             # 4. 保存结果
             output_file = self.save_results(result_df)
             
-            # 5. 保存详细匹配报告（文本和JSON格式）
-            report_file_txt = self.save_match_report(format_type='txt')
-            report_file_json = self.save_match_report(format_type='json')
+            # 5. 生成详细匹配报告，文本、JSON报告和处理摘要共用同一份
+            detailed_report = self.generate_detailed_match_report()
+            
+            # 6. 保存详细匹配报告（文本和JSON格式）
+            report_file_txt = self.save_match_report(format_type='txt', detailed_report=detailed_report)
+            report_file_json = self.save_match_report(format_type='json', detailed_report=detailed_report)
             
-            # 6. 导出失败记录（如果有）
+            # 7. 导出失败记录（如果有）
             failed_records_file = None
             if self.failed_records:
                 failed_records_file = self.export_failed_records()
             
-            # 7. 生成详细的处理摘要
-            detailed_report = self.generate_detailed_match_report()
-            
+            # 8. 生成详细的处理摘要
             summary = {
                 'input_file': self.input_csv,
                 'output_file': output_file,
@@ -14,10 +14,18 @@ import os
 from typing import Dict, Any
 import logging
 
+# 安装了pyarrow时重复项结果使用Arrow存储的列，字符串占用内存更少、导出更快
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+_READ_SQL_KWARGS = {'dtype_backend': 'pyarrow'} if pyarrow is not None else {}
+
 class DuplicateChecker:
     """重复检查器类"""
     
@@ -34,8 +42,67 @@ class DuplicateChecker:
         if not os.path.exists(db_path):
             raise FileNotFoundError(f"数据库文件不存在: {db_path}")
         
+        # 所有查询共用一个连接，避免每次查询重新打开数据库
+        self._conn = sqlite3.connect(db_path)
+        self._configure_connection()
+        self._ensure_duplicate_indexes()
+        
         logger.info(f"初始化重复检查器，数据库路径: {db_path}")
     
+    def close(self) -> None:
+        """
+        关闭数据库连接
+        """
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+    
+    def __enter__(self) -> 'DuplicateChecker':
+        """
+        支持with语句，退出时自动关闭数据库连接
+        """
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        """
+        退出with语句时关闭数据库连接
+        """
+        self.close()
+    
+    def _configure_connection(self) -> None:
+        """
+        设置重复检查（大表GROUP BY）相关的性能PRAGMA
+        
+        未切换到WAL：检查过程只读（索引创建除外），WAL对读无益，
+        且会持久改变数据库文件的日志模式并生成-wal/-shm文件
+        """
+        self._conn.executescript('''
+            PRAGMA synchronous = NORMAL;
+            PRAGMA temp_store = MEMORY;
+            PRAGMA mmap_size = 1073741824;  -- 1GB
+            PRAGMA cache_size = -262144;  -- 约256MB
+        ''')
+    
+    def _ensure_duplicate_indexes(self) -> None:
+        """
+        确保重复检查所用的覆盖索引存在，使GROUP BY直接走索引而非全表扫描加排序
+        
+        索引名与sqlite_integrator.create_indexes一致，已建库时不会重复创建
+        """
+        try:
+            self._conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_state_names_duplicate
+                ON state_names(country_code, name)
+            ''')
+            self._conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_city_names_duplicate
+                ON city_names(country_code, state_geonameid, name)
+            ''')
+            self._conn.commit()
+        except sqlite3.Error as e:
+            # 只读数据库或表缺失时退回无索引查询
+            logger.warning(f"创建重复检查索引失败: {e}")
+    
     def check_state_name_duplicates(self) -> pd.DataFrame:
         """
         检查state_names表中的重复项
@@ -48,16 +115,14 @@ class DuplicateChecker:
         logger.info("开始检查state_names表中的重复项")
         
         query = '''
-        SELECT country_code, name
+        SELECT country_code, name, COUNT(*) AS duplicate_count
         FROM state_names 
         GROUP BY country_code, name 
         HAVING COUNT(*) > 1
         '''
         
         try:
-            conn = sqlite3.connect(self.db_path)
-            result = pd.read_sql_query(query, conn)
-            conn.close()
+            result = pd.read_sql_query(query, self._conn, **_READ_SQL_KWARGS)
             
             logger.info(f"发现 {len(result)} 个state_names重复项")
             return result
@@ -78,16 +143,14 @@ class DuplicateChecker:
         logger.info("开始检查city_names表中的重复项")
         
         query = '''
-        SELECT country_code, state_geonameid, name
+        SELECT country_code, state_geonameid, name, COUNT(*) AS duplicate_count
         FROM city_names 
         GROUP BY country_code, state_geonameid, name 
         HAVING COUNT(*) > 1
         '''
         
         try:
-            conn = sqlite3.connect(self.db_path)
-            result = pd.read_sql_query(query, conn)
-            conn.close()
+            result = pd.read_sql_query(query, self._conn, **_READ_SQL_KWARGS)
             
             logger.info(f"发现 {len(result)} 个city_names重复项")
             return result
@@ -96,47 +159,64 @@ class DuplicateChecker:
             logger.error(f"检查city_names重复项时出错: {e}")
             raise
     
-    def get_duplicate_statistics(self) -> Dict[str, Any]:
+    def get_duplicate_statistics(self, state_dups: pd.DataFrame = None,
+                                 city_dups: pd.DataFrame = None) -> Dict[str, Any]:
         """
         获取重复项统计信息
         
+        Args:
+            state_dups (pd.DataFrame, optional): 已查询的state_names重复项，为None时在SQL中聚合
+            city_dups (pd.DataFrame, optional): 已查询的city_names重复项，为None时在SQL中聚合
+        
         Returns:
             Dict[str, Any]: 包含统计信息的字典
         """
         logger.info("生成重复项统计信息")
         
+        # 已有重复项明细时只查询总记录数，避免再做一遍GROUP BY
+        totals_query = '''
+        SELECT (SELECT COUNT(*) FROM state_names), (SELECT COUNT(*) FROM city_names)
+        '''
+        
+        # 总记录数、重复组数和重复记录数在一次查询中完成，重复组只聚合不取回明细
+        query = '''
+        SELECT * FROM
+            (SELECT COUNT(*) FROM state_names),
+            (SELECT COUNT(*) FROM city_names),
+            (SELECT COUNT(*), COALESCE(SUM(cnt), 0) FROM (
+                SELECT COUNT(*) AS cnt FROM state_names
+                GROUP BY country_code, name
+                HAVING cnt > 1
+            )),
+            (SELECT COUNT(*), COALESCE(SUM(cnt), 0) FROM (
+                SELECT COUNT(*) AS cnt FROM city_names
+                GROUP BY country_code, state_geonameid, name
+                HAVING cnt > 1
+            ))
+        '''
+        
         try:
-            state_dups = self.check_state_name_duplicates()
-            city_dups = self.check_city_name_duplicates()
-            
-            # 计算总记录数
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("SELECT COUNT(*) FROM state_names")
-            total_state_names = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM city_names")
-            total_city_names = cursor.fetchone()[0]
-            
-            conn.close()
-            
-            # 计算重复记录数
-            # state_duplicate_records = state_dups['duplicate_count'].sum() if len(state_dups) > 0 else 0
-            # city_duplicate_records = city_dups['duplicate_count'].sum() if len(city_dups) > 0 else 0
-            state_duplicate_records = len(state_dups)
-            city_duplicate_records = len(city_dups)
+            if state_dups is not None and city_dups is not None:
+                total_state_names, total_city_names = self._conn.execute(totals_query).fetchone()
+                state_duplicate_groups = len(state_dups)
+                state_duplicate_records = int(state_dups['duplicate_count'].sum())
+                city_duplicate_groups = len(city_dups)
+                city_duplicate_records = int(city_dups['duplicate_count'].sum())
+            else:
+                (total_state_names, total_city_names,
+                 state_duplicate_groups, state_duplicate_records,
+                 city_duplicate_groups, city_duplicate_records) = self._conn.execute(query).fetchone()
             
             statistics = {
                 'state_names': {
                     'total_records': total_state_names,
-                    'duplicate_groups': len(state_dups),
+                    'duplicate_groups': state_duplicate_groups,
                     'duplicate_records': state_duplicate_records,
                     'duplicate_rate': (state_duplicate_records / total_state_names * 100) if total_state_names > 0 else 0
                 },
                 'city_names': {
                     'total_records': total_city_names,
-                    'duplicate_groups': len(city_dups),
+                    'duplicate_groups': city_duplicate_groups,
                     'duplicate_records': city_duplicate_records,
                     'duplicate_rate': (city_duplicate_records / total_city_names * 100) if total_city_names > 0 else 0
                 }
@@ -149,20 +229,25 @@ class DuplicateChecker:
             logger.error(f"生成统计信息时出错: {e}")
             raise
     
-    def generate_duplicate_report(self, output_file='duplicate_report.txt') -> None:
+    def generate_duplicate_report(self, output_file='duplicate_report.txt', state_dups: pd.DataFrame = None,
+                                  city_dups: pd.DataFrame = None) -> None:
         """
         生成详细的重复项报告
         
         Args:
             output_file (str): 输出文件路径
+            state_dups (pd.DataFrame, optional): 已查询的state_names重复项，为None时重新查询
+            city_dups (pd.DataFrame, optional): 已查询的city_names重复项，为None时重新查询
         """
         logger.info(f"开始生成重复项报告: {output_file}")
         
         try:
             # 获取重复项数据
-            state_dups = self.check_state_name_duplicates()
-            city_dups = self.check_city_name_duplicates()
-            statistics = self.get_duplicate_statistics()
+            if state_dups is None:
+                state_dups = self.check_state_name_duplicates()
+            if city_dups is None:
+                city_dups = self.check_city_name_duplicates()
+            statistics = self.get_duplicate_statistics(state_dups, city_dups)
             
             # 创建输出目录
             os.makedirs(os.path.dirname(output_file) if os.path.dirname(output_file) else '.', exist_ok=True)
@@ -192,8 +277,8 @@ class DuplicateChecker:
                 f.write("=" * 80 + "\n\n")
                 
                 if len(state_dups) > 0:
-                    f.write(state_dups.to_string(index=False))
-                    f.write("\n\n")
+                    state_dups.to_csv(f, sep='\t', index=False, lineterminator='\n')
+                    f.write("\n")
                 else:
                     f.write("未发现重复项\n\n")
                 
@@ -203,8 +288,8 @@ class DuplicateChecker:
                 f.write("=" * 80 + "\n\n")
                 
                 if len(city_dups) > 0:
-                    f.write(city_dups.to_string(index=False))
-                    f.write("\n\n")
+                    city_dups.to_csv(f, sep='\t', index=False, lineterminator='\n')
+                    f.write("\n")
                 else:
                     f.write("未发现重复项\n\n")
                 
@@ -227,44 +312,34 @@ class DuplicateChecker:
         """
         logger.info("验证数据库结构")
         
+        # 一次查询取回所有表的列名，按表聚合为集合
+        query = """
+        SELECT m.name, p.name
+        FROM sqlite_master m JOIN pragma_table_info(m.name) p
+        WHERE m.type = 'table' AND m.name IN ('state_names', 'city_names')
+        """
+        required_columns = {
+            'state_names': {'country_code', 'name', 'geonameid'},
+            'city_names': {'country_code', 'state_geonameid', 'name', 'geonameid'},
+        }
+        
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # 检查必需的表是否存在
-            required_tables = ['state_names', 'city_names']
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-            existing_tables = [row[0] for row in cursor.fetchall()]
+            table_columns = {}
+            for table, column in self._conn.execute(query):
+                table_columns.setdefault(table, set()).add(column)
             
-            for table in required_tables:
-                if table not in existing_tables:
+            for table, columns in required_columns.items():
+                # 检查必需的表是否存在
+                if table not in table_columns:
                     logger.error(f"缺少必需的表: {table}")
-                    conn.close()
-                    return False
-            
-            # 检查state_names表结构
-            cursor.execute("PRAGMA table_info(state_names)")
-            state_names_columns = [row[1] for row in cursor.fetchall()]
-            required_state_columns = ['country_code', 'name', 'geonameid']
-            
-            for col in required_state_columns:
-                if col not in state_names_columns:
-                    logger.error(f"state_names表缺少必需的列: {col}")
-                    conn.close()
                     return False
-            
-            # 检查city_names表结构
-            cursor.execute("PRAGMA table_info(city_names)")
-            city_names_columns = [row[1] for row in cursor.fetchall()]
-            required_city_columns = ['country_code', 'state_geonameid', 'name', 'geonameid']
-            
-            for col in required_city_columns:
-                if col not in city_names_columns:
-                    logger.error(f"city_names表缺少必需的列: {col}")
-                    conn.close()
+                
+                # 检查表结构
+                missing_columns = columns - table_columns[table]
+                if missing_columns:
+                    logger.error(f"{table}表缺少必需的列: {', '.join(sorted(missing_columns))}")
                     return False
             
-            conn.close()
             logger.info("数据库结构验证通过")
             return True
             
@@ -289,44 +364,43 @@ def test_duplicate_checker():
             print("请先运行sqlite_integrator.py生成测试数据库")
             return
         
-        # 创建重复检查器实例
-        checker = DuplicateChecker(test_db_path)
+        # 创建重复检查器实例，结束后关闭数据库连接
+        with DuplicateChecker(test_db_path) as checker:
+            # 验证数据库结构
+            print("\n1. 验证数据库结构...")
+            if checker.validate_database_structure():
+                print("✓ 数据库结构验证通过")
+            else:
+                print("✗ 数据库结构验证失败")
+                return
         
-        # 验证数据库结构
-        print("\n1. 验证数据库结构...")
-        if checker.validate_database_structure():
-            print("✓ 数据库结构验证通过")
-        else:
-            print("✗ 数据库结构验证失败")
-            return
+            # 检查state_names重复项
+            print("\n2. 检查state_names重复项...")
+            state_dups = checker.check_state_name_duplicates()
+            print(f"发现 {len(state_dups)} 个state_names重复组")
+            if len(state_dups) > 0:
+                print("前5个重复项:")
+                print(state_dups.head().to_string(index=False))
+        
+            # 检查city_names重复项
+            print("\n3. 检查city_names重复项...")
+            city_dups = checker.check_city_name_duplicates()
+            print(f"发现 {len(city_dups)} 个city_names重复组")
+            if len(city_dups) > 0:
+                print("前5个重复项:")
+                print(city_dups.head().to_string(index=False))
+        
+            # 生成统计信息
+            print("\n4. 生成统计信息...")
+            stats = checker.get_duplicate_statistics()
+            print(f"State Names: {stats['state_names']['duplicate_groups']} 重复组, {stats['state_names']['duplicate_rate']:.2f}% 重复率")
+            print(f"City Names: {stats['city_names']['duplicate_groups']} 重复组, {stats['city_names']['duplicate_rate']:.2f}% 重复率")
         
-        # 检查state_names重复项
-        print("\n2. 检查state_names重复项...")
-        state_dups = checker.check_state_name_duplicates()
-        print(f"发现 {len(state_dups)} 个state_names重复组")
-        if len(state_dups) > 0:
-            print("前5个重复项:")
-            print(state_dups.head().to_string(index=False))
-        
-        # 检查city_names重复项
-        print("\n3. 检查city_names重复项...")
-        city_dups = checker.check_city_name_duplicates()
-        print(f"发现 {len(city_dups)} 个city_names重复组")
-        if len(city_dups) > 0:
-            print("前5个重复项:")
-            print(city_dups.head().to_string(index=False))
-        
-        # 生成统计信息
-        print("\n4. 生成统计信息...")
-        stats = checker.get_duplicate_statistics()
-        print(f"State Names: {stats['state_names']['duplicate_groups']} 重复组, {stats['state_names']['duplicate_rate']:.2f}% 重复率")
-        print(f"City Names: {stats['city_names']['duplicate_groups']} 重复组, {stats['city_names']['duplicate_rate']:.2f}% 重复率")
-        
-        # 生成重复项报告
-        print("\n5. 生成重复项报告...")
-        report_file = 'test_duplicate_report.txt'
-        checker.generate_duplicate_report(report_file)
-        print(f"✓ 重复项报告已生成: {report_file}")
+            # 生成重复项报告
+            print("\n5. 生成重复项报告...")
+            report_file = 'test_duplicate_report.txt'
+            checker.generate_duplicate_report(report_file)
+            print(f"✓ 重复项报告已生成: {report_file}")
         
         print("\n=" * 60)
         print("重复检查器测试完成")
@@ -4,6 +4,7 @@ import pandas as pd
 import os
 import sys
 
+from collections import defaultdict
 from datetime import datetime
 from typing import Dict, List, Tuple, Any, Optional
 
@@ -155,6 +156,15 @@ class GeonamesProcessor:
             'already_correct': 0
         }
         
+        # 预先按wikiDataId收集CSC记录的经纬度（单次遍历列数组），避免每个条目都扫描整个CSC表
+        csc_coordinates = defaultdict(list)
+        csc_df = getattr(self.csc_processor, 'cleaned_data', None)
+        if csc_df is not None:
+            for csc_wikidata_id, latitude, longitude in zip(csc_df['wikiDataId'].to_numpy(),
+                                                            csc_df['latitude'].to_numpy(),
+                                                            csc_df['longitude'].to_numpy()):
+                csc_coordinates[csc_wikidata_id].append((latitude, longitude))
+        
         # 处理每个geonameid
         for wikidata_id, original_geonameid in geonameid_mapping.items():
             try:
@@ -197,9 +207,8 @@ class GeonamesProcessor:
                     #     int(original_geonameid), country_code, admin1_code, admin2_code, states_df, cities_df
                     # )
                 
-                csc_df = self.csc_processor.cleaned_data
-                for _, row in csc_df[csc_df['wikiDataId'] == wikidata_id].iterrows():
-                    if abs(row['latitude'] - original_record['latitude']) > 10 or abs(row['longitude'] - original_record['longitude']) > 10:
+                for latitude, longitude in csc_coordinates.get(wikidata_id, ()):
+                    if abs(latitude - original_record['latitude']) > 10 or abs(longitude - original_record['longitude']) > 10:
                         logger.warning(f"geonameid {original_geonameid} 与原始经纬度偏差过大 {country_code, admin1_code, admin2_code}")
                         correct_geonameid_str = None
                         break
@@ -582,21 +591,34 @@ class GeonamesProcessor:
                     logger.error(f"初始化重复检查器失败: {e}")
                     raise
             
-            # 生成重复项报告
-            report_file = f'{self.sqlite_output_dir}/duplicate_report.txt'
+            # 检查完成后关闭数据库连接，下次检查时重新创建
             try:
-                self.duplicate_checker.generate_duplicate_report(report_file)
-                logger.info(f"重复项报告已生成: {report_file}")
-            except Exception as e:
-                logger.error(f"生成重复项报告失败: {e}")
-                raise
+                # 重复项明细只查询一次，报告和统计信息共用
+                try:
+                    state_dups = self.duplicate_checker.check_state_name_duplicates()
+                    city_dups = self.duplicate_checker.check_city_name_duplicates()
+                except Exception as e:
+                    logger.error(f"查询重复项失败: {e}")
+                    raise
             
-            # 获取统计信息
-            try:
-                duplicate_stats = self.duplicate_checker.get_duplicate_statistics()
-            except Exception as e:
-                logger.error(f"获取重复项统计失败: {e}")
-                raise
+                # 生成重复项报告
+                report_file = f'{self.sqlite_output_dir}/duplicate_report.txt'
+                try:
+                    self.duplicate_checker.generate_duplicate_report(report_file, state_dups, city_dups)
+                    logger.info(f"重复项报告已生成: {report_file}")
+                except Exception as e:
+                    logger.error(f"生成重复项报告失败: {e}")
+                    raise
+            
+                # 获取统计信息
+                try:
+                    duplicate_stats = self.duplicate_checker.get_duplicate_statistics(state_dups, city_dups)
+                except Exception as e:
+                    logger.error(f"获取重复项统计失败: {e}")
+                    raise
+            finally:
+                self.duplicate_checker.close()
+                self.duplicate_checker = None
             
             # 记录检查时间
             check_time = time.time() - start_time
@@ -45,8 +45,24 @@ class SQLiteIntegrator:
         # return conn
         if self.engine is None:
             self.engine = sqlalchemy.create_engine('sqlite:///%s' % self.db_path)
+            sqlalchemy.event.listen(self.engine, 'connect', self._configure_connection)
         return self.engine
     
+    @staticmethod
+    def _configure_connection(dbapi_connection, connection_record) -> None:
+        """新建连接时设置读写性能相关的PRAGMA
+        
+        Args:
+            dbapi_connection: sqlite3原始连接
+            connection_record: SQLAlchemy连接池记录
+        """
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA synchronous = NORMAL")
+        cursor.execute("PRAGMA temp_store = MEMORY")
+        cursor.execute("PRAGMA mmap_size = 268435456")  # 256MB
+        cursor.execute("PRAGMA cache_size = -200000")  # 约200MB
+        cursor.close()
+    
     def get_connection(self) -> sqlite3.Connection:
         return self.get_engine().raw_connection()
     
@@ -206,6 +222,19 @@ class SQLiteIntegrator:
                 ON city_names(country_code, state_geonameid, name)
             """)
             
+            # 为states/cities表的geonameid创建索引（state_names/city_names按geonameid关联查询）
+            # 注：state_names/city_names的country_code和name列声明了COLLATE NOCASE，
+            # 上面的索引沿用列的排序规则，大小写不敏感的查询可以直接使用
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_states_geonameid 
+                ON states(geonameid)
+            """)
+            
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_cities_geonameid 
+                ON cities(geonameid)
+            """)
+            
             # 为states表创建country_code索引
             cursor.execute("""
                 CREATE INDEX IF NOT EXISTS idx_states_country 
@@ -10,6 +10,7 @@ import time
 import logging
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 from tqdm import tqdm
@@ -72,8 +73,11 @@ class WikidataCache:
             # 确保缓存目录存在
             os.makedirs(os.path.dirname(self.cache_file_path), exist_ok=True)
             
-            with open(self.cache_file_path, 'w', encoding='utf-8') as f:
-                json.dump(self.cache_data, f, ensure_ascii=False, indent=2)
+            # 先写入临时文件再原子替换，避免中断时损坏已有缓存；紧凑格式减小文件体积和读写时间
+            temp_file_path = self.cache_file_path + '.tmp'
+            with open(temp_file_path, 'w', encoding='utf-8') as f:
+                json.dump(self.cache_data, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(temp_file_path, self.cache_file_path)
             logging.getLogger(__name__).debug(f"缓存已保存: {len(self.cache_data)} 条记录")
         except Exception as e:
             logging.getLogger(__name__).error(f"保存缓存文件失败: {e}")
@@ -233,7 +237,30 @@ def doSparql(query):
     for val in ret['results']['bindings']:
         yield {k: v['value'] for k,v in val.items()}
 
-def batch_query_geonameid(wikidata_ids: List[str], batch_size: int = 500, enable_cache: bool = True) -> Dict[str, str]:
+def _query_geonameid_batch(batch_ids: List[str]) -> List[Dict[str, str]]:
+    """
+    执行单个批次的geonameid SPARQL查询
+    
+    Args:
+        batch_ids: 本批次的wikiDataId列表
+        
+    Returns:
+        List[Dict[str, str]]: 查询结果行列表（item、geonameid、redirected）
+    """
+    values_clause = '\n'.join(f'wd:{qid}' for qid in batch_ids)
+    query = f'''
+    SELECT ?item ?geonameid ?redirected WHERE {{
+    VALUES ?item {{
+    {values_clause}
+    }}
+    OPTIONAL {{ ?item wdt:P1566 ?geonameid. }}
+    OPTIONAL {{ ?item owl:sameAs ?redirected. }}
+    }}'''
+    
+    return list(doSparql(query))
+
+def batch_query_geonameid(wikidata_ids: List[str], batch_size: int = 500, enable_cache: bool = True,
+                          max_workers: int = 4) -> Dict[str, str]:
     """
     批量查询wikiDataId对应的geonameid，支持本地缓存
     
@@ -241,6 +268,7 @@ def batch_query_geonameid(wikidata_ids: List[str], batch_size: int = 500, enable
         wikidata_ids: wikiDataId列表 (格式: Q123456)
         batch_size: 每批查询的数量，默认500
         enable_cache: 是否启用缓存，默认True
+        max_workers: 并发查询的批次数，默认4（Wikidata查询服务限制单IP并发数，不宜过大）
         
     Returns:
         Dict[str, str]: {wikiDataId: geonameid} 映射字典
@@ -254,15 +282,14 @@ def batch_query_geonameid(wikidata_ids: List[str], batch_size: int = 500, enable
     # 初始化缓存
     cache = WikidataCache() if enable_cache else None
     result_mapping = {}
-    failed_ids = []
     
     # 如果启用缓存，先从缓存中获取已有结果
     if cache:
         cached_results = cache.get_cached_results(wikidata_ids)
         result_mapping.update(cached_results)
         
-        # 获取未缓存的ID列表
-        uncached_ids = cache.get_uncached_ids(wikidata_ids)
+        # 未命中缓存的ID（直接从命中结果中扣除，不再逐个重复查缓存）
+        uncached_ids = [wikidata_id for wikidata_id in wikidata_ids if wikidata_id not in cached_results]
         logger.info(f"缓存命中: {len(cached_results)}/{len(wikidata_ids)}, 需要查询: {len(uncached_ids)}")
         
         # 如果全部命中缓存，直接返回
@@ -275,71 +302,64 @@ def batch_query_geonameid(wikidata_ids: List[str], batch_size: int = 500, enable
     else:
         query_ids = wikidata_ids
     
-    # 分批处理未缓存的ID
-    for start in tqdm(range(0, len(query_ids), batch_size), desc="查询Wikidata"):
-        end = min(len(query_ids), start + batch_size)
-        batch_ids = query_ids[start:end]
+    # 分批处理未缓存的ID：网络查询在线程池中并发执行，结果合并和缓存写入都在当前线程完成
+    batches = [query_ids[start:start + batch_size] for start in range(0, len(query_ids), batch_size)]
+    redirectedIds = {} # newQid -> oldQid
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(_query_geonameid_batch, batch_ids): (batch_index, batch_ids)
+            for batch_index, batch_ids in enumerate(batches, 1)
+        }
         
-        try:
-            # 构建SPARQL查询
-            values_clause = '\n'.join(f'wd:{qid}' for qid in batch_ids)
-            query = f'''
-            SELECT ?item ?geonameid ?redirected WHERE {{
-            VALUES ?item {{
-            {values_clause}
-            }}
-            OPTIONAL {{ ?item wdt:P1566 ?geonameid. }}
-            OPTIONAL {{ ?item owl:sameAs ?redirected. }}
-            }}'''
+        for future in tqdm(as_completed(futures), total=len(futures), desc="查询Wikidata"):
+            batch_index, batch_ids = futures[future]
             
-            # 执行查询
-            batch_results = list(doSparql(query))
-            
-            redirectedIds = {} # newQid -> oldQid
-            # 处理结果
-            for result in batch_results:
-                item_uri = result.get('item', '')
-                geonameid = result.get('geonameid', '')
-                redirected = result.get('redirected', '')
+            try:
+                batch_results = future.result()
                 
-                # 从URI中提取QID
-                assert item_uri.startswith('http://www.wikidata.org/entity/')
-                qid = item_uri.replace('http://www.wikidata.org/entity/', '')
-                if geonameid:
-                    result_mapping[qid] = geonameid
-                    # 缓存查询结果
-                    if cache:
-                        cache.cache_result(qid, geonameid)
-                elif redirected:
-                    assert redirected.startswith('http://www.wikidata.org/entity/')
-                    newQid = redirected.replace('http://www.wikidata.org/entity/', '')
-                    redirectedIds[newQid] = qid
-                else:
-                    continue
-            
-            if redirectedIds:
-                logger.info(f"查询 {len(redirectedIds)} 个重定向ID")
-                redirectedResults = batch_query_geonameid(redirectedIds.keys(), batch_size, enable_cache)
-                for newQid, geonameid in redirectedResults.items():
-                    oldQid = redirectedIds[newQid]
-                    result_mapping[oldQid] = geonameid
-                    result_mapping[newQid] = geonameid
-                    # 缓存查询结果
-                    if cache:
-                        cache.cache_result(oldQid, geonameid)
-                        cache.cache_result(newQid, geonameid)
-
-            # 记录未找到geonameid的ID
-            found_ids = set(result_mapping.keys())
-            batch_failed = [qid for qid in batch_ids if qid not in found_ids]
-            failed_ids.extend(batch_failed)
-            
-            logger.debug(f"批次 {start//batch_size + 1}: 成功查询 {len(batch_results)} 个，失败 {len(batch_failed)} 个")
-            
-        except Exception as e:
-            logger.error(f"批次查询失败 (批次 {start//batch_size + 1}): {str(e)}")
-            failed_ids.extend(batch_ids)
-            continue
+                # 处理结果
+                for result in batch_results:
+                    item_uri = result.get('item', '')
+                    geonameid = result.get('geonameid', '')
+                    redirected = result.get('redirected', '')
+                    
+                    # 从URI中提取QID
+                    assert item_uri.startswith('http://www.wikidata.org/entity/')
+                    qid = item_uri.replace('http://www.wikidata.org/entity/', '')
+                    if geonameid:
+                        result_mapping[qid] = geonameid
+                        # 缓存查询结果
+                        if cache:
+                            cache.cache_result(qid, geonameid)
+                    elif redirected:
+                        assert redirected.startswith('http://www.wikidata.org/entity/')
+                        newQid = redirected.replace('http://www.wikidata.org/entity/', '')
+                        redirectedIds[newQid] = qid
+                    else:
+                        continue
+                
+                logger.debug(f"批次 {batch_index}: 成功查询 {len(batch_results)} 个")
+                
+            except Exception as e:
+                logger.error(f"批次查询失败 (批次 {batch_index}): {str(e)}")
+                continue
+    
+    # 重定向ID在线程池关闭后统一查询一次，避免递归查询再开线程池导致并发请求数超过限制
+    if redirectedIds:
+        logger.info(f"查询 {len(redirectedIds)} 个重定向ID")
+        redirectedResults = batch_query_geonameid(list(redirectedIds.keys()), batch_size, enable_cache, max_workers)
+        for newQid, geonameid in redirectedResults.items():
+            oldQid = redirectedIds[newQid]
+            result_mapping[oldQid] = geonameid
+            result_mapping[newQid] = geonameid
+            # 缓存查询结果
+            if cache:
+                cache.cache_result(oldQid, geonameid)
+                cache.cache_result(newQid, geonameid)
+    
+    # 记录未找到geonameid的ID（包括查询失败的批次）
+    failed_ids = [qid for qid in query_ids if qid not in result_mapping]
     
     # 保存缓存并输出统计信息
     if cache:
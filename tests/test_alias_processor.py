@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+别名处理器测试模块
+验证别名清理规则以及向量化处理与逐条处理结果一致
+"""
+
+import unittest
+import os
+import sys
+import pandas as pd
+
+# 添加src目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from alias_processor import AliasProcessor
+
+class TestAliasProcessor(unittest.TestCase):
+    """
+    别名处理器测试类
+    """
+
+    def setUp(self):
+        """
+        测试前的设置
+        """
+        self.processor = AliasProcessor()
+        self.records = [
+            ['Los Angeles County', 'LA', 'L.A.'],
+            ['Tokyo Shi', '東京市', 'Tokyo'],
+            ['Seoul Si', '서울시', 'Seoul'],
+            ['San Francisco', 'SF', 'San-Francisco'],
+            ['Osaka Fu', '大阪府', 'Osaka', 'Osaka'],
+            ['County Cork', 'Corcaigh'],
+            ['市', ' ', '!!!'],
+            [' '],
+        ]
+
+    def test_process_alternatenames(self):
+        """
+        测试逐条别名处理
+        """
+        result = self.processor.process_alternatenames(['Tokyo Shi', '東京市'])
+        self.assertEqual(result, sorted(result))
+        self.assertIn('Tokyo Shi', result)
+        self.assertIn('Tokyo', result)
+        self.assertIn('東京', result)
+
+    def test_remove_county_suffix_keeps_inner_whitespace(self):
+        """
+        测试删除County时保留名称内部的空白
+        """
+        self.assertEqual(self.processor.remove_county_suffix('Los Angeles County'), 'Los Angeles')
+        self.assertEqual(self.processor.remove_county_suffix('County  Cork'), 'Cork')
+
+        result = self.processor.process_alternatenames(['Los Angeles County'])
+        self.assertIn('Los Angeles', result)
+        self.assertIn('LosAngeles', result)
+
+    def test_series_matches_scalar(self):
+        """
+        测试向量化处理结果与逐条处理一致
+        """
+        s = pd.Series(self.records).explode()
+        result = self.processor.process_alternatenames_series(s)
+
+        self.assertEqual(len(result), len(self.records))
+        for index, raw_aliases in enumerate(self.records):
+            self.assertEqual(list(result[index]), self.processor.process_alternatenames(raw_aliases))
+
+    def test_series_suffix_before_trailing_newline(self):
+        """
+        测试后缀后面跟着换行符时，向量化处理与逐条处理一样不把它当作末尾后缀
+        """
+        records = [['Tokyo Shi\n', 'Kōbe Shi\n', 'Kōbe Shi']]
+        result = self.processor.process_alternatenames_series(pd.Series(records).explode())
+        self.assertEqual(list(result[0]), self.processor.process_alternatenames(records[0]))
+        self.assertNotIn('Tokyo', result[0])
+        self.assertIn('Kōbe', result[0])
+
+    def test_process_batch_matches_scalar(self):
+        """
+        测试多进程批量处理结果与逐条处理一致且顺序不变
+        """
+        records = self.records * (self.processor.BATCH_CHUNK_SIZE // len(self.records) + 1)
+        expected = [self.processor.process_alternatenames(raw_aliases) for raw_aliases in records]
+
+        self.assertEqual(self.processor.process_batch(records, max_workers=2), expected)
+        self.assertEqual(self.processor.process_batch(self.records), expected[:len(self.records)])
+
+    def test_is_ascii(self):
+        """
+        测试ASCII判断
+        """
+        self.assertTrue(self.processor.is_ascii('Tokyo'))
+        self.assertFalse(self.processor.is_ascii('東京'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CSC数据处理器测试模块
+验证CSC数据加载时NULL文本的缺失值处理，以及pyarrow引擎与C引擎的读取结果一致
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import pandas as pd
+from unittest.mock import patch
+
+# 添加src目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import csc_processor
+from csc_processor import CSCProcessor
+
+class TestCSCProcessorLoad(unittest.TestCase):
+    """
+    CSC数据加载测试类
+    """
+
+    def setUp(self):
+        """
+        测试前的设置：创建包含NULL文本的CSC数据文件
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.temp_dir, 'cities.txt')
+        with open(self.csv_path, 'w', encoding='utf-8') as f:
+            f.write('id,name,state_id,state_code,state_name,country_id,country_code,country_name,latitude,longitude,wikiDataId\n')
+            f.write('1,Alpha,NULL,S1,NULL,5,US,United States,1.5,NULL,NULL\n')
+            f.write('2,Beta,3,S2,Texas,5,US,United States,2.5,3.5,Q42\n')
+            f.write('3,null,4,S2,Texas,5,US,United States,2.5,3.5,null\n')
+        self.processor = CSCProcessor(self.csv_path)
+
+    def tearDown(self):
+        """
+        测试后的清理
+        """
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_null_text_loaded_as_missing(self):
+        """
+        测试NULL/null文本在所有字符串列中都被读取为缺失值
+        """
+        df = self.processor.load_csc_data()
+
+        self.assertTrue(pd.isna(df.loc[0, 'state_name']))
+        self.assertTrue(pd.isna(df.loc[0, 'wikiDataId']))
+        self.assertTrue(pd.isna(df.loc[2, 'name']))
+        self.assertTrue(pd.isna(df.loc[2, 'wikiDataId']))
+        self.assertTrue(pd.isna(df.loc[0, 'state_id']))
+        self.assertTrue(pd.isna(df.loc[0, 'longitude']))
+
+        summary = self.processor.get_data_summary(df)
+        self.assertEqual(summary['missing_wikidata_ids'], 2)
+        self.assertEqual(summary['valid_wikidata_ids'], 1)
+        self.assertEqual(self.processor._validate_wikidata_ids(df), [])
+
+    def test_engines_consistent(self):
+        """
+        测试pyarrow引擎与C引擎读取结果一致
+        """
+        df_default = self.processor.load_csc_data()
+        with patch.object(csc_processor, '_CSV_ENGINE', 'c'):
+            df_c = self.processor.load_csc_data()
+
+        pd.testing.assert_frame_equal(df_default, df_c)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CSV导出模块测试
+验证各写出方式的输出格式与pandas的to_csv一致，以及异常数据的回退处理
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import gzip
+import io
+import pandas as pd
+from unittest.mock import patch
+
+# 添加src目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import csv_exporter
+from csv_exporter import CSVExporter
+
+class TestCSVExporter(unittest.TestCase):
+    """
+    CSV导出器测试类
+    """
+
+    def setUp(self):
+        """
+        测试前的设置
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.exporter = CSVExporter(self.temp_dir)
+        self.states_df = pd.DataFrame({
+            'geonameid': [1001, 1002, 1003],
+            'name': ['California', 'Texas, "Lone Star"', None],
+            'latitude': [40.0, 1e-07, None],
+            'longitude': [-120.5, 0.1, 2.0],
+            'country_code': ['US', 'US', 'US'],
+            'admin1_code': ['CA', 'TX', '01'],
+            'population': [39_000_000, 29_000_000, 0],
+        })
+
+    def tearDown(self):
+        """
+        测试后的清理
+        """
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _read(self, filename):
+        with open(os.path.join(self.temp_dir, filename), encoding='utf-8', newline='') as f:
+            return f.read()
+
+    def _expected(self, df):
+        return df.to_csv(index=False, lineterminator=os.linesep)
+
+    def test_states_default_matches_to_csv(self):
+        """
+        测试states默认导出格式与pandas的to_csv逐字节一致
+        """
+        self.assertTrue(self.exporter.export_states(self.states_df))
+        self.assertEqual(self._read('states.csv'), self._expected(self.states_df))
+
+    def test_pandas_writer_matches_to_csv(self):
+        """
+        测试pandas写出路径（含快速拼接路径及其回退）在各类字段上与to_csv逐字节一致
+        """
+        frames = {
+            'nullable': pd.DataFrame({
+                'id': pd.array([1, None, -3], dtype='Int64'),
+                'value': [0.1, float('nan'), -2.5e-08],
+                'text': pd.array(['a,b', None, 'say "hi"'], dtype='string'),
+                'note': ['line\nbreak', '', None],
+            }),
+            'carriage_return': pd.DataFrame({'id': [1, 2], 'text': ['a\rb', 'c']}),
+            'mixed_objects': pd.DataFrame({'id': [1, 2], 'code': pd.Series(['CA', 48], dtype=object)}),
+            'single_column': pd.DataFrame({'text': ['a', None]}),
+        }
+        for name, df in frames.items():
+            with self.subTest(name=name):
+                path = os.path.join(self.temp_dir, f'{name}.csv')
+                self.exporter._write_csv(df, path)
+                self.assertEqual(self._read(f'{name}.csv'), self._expected(df))
+
+    @unittest.skipIf(csv_exporter.pacsv is None, "未安装pyarrow")
+    def test_arrow_backend_falls_back_on_mixed_objects(self):
+        """
+        测试Arrow写入器遇到无法转换的混合类型列时回退到pandas写出
+        """
+        df = self.states_df.assign(admin1_code=pd.Series(['CA', 48, ['x']], dtype=object))
+        self.assertTrue(self.exporter.export_states(df, backend='pyarrow'))
+        self.assertEqual(self._read('states.csv'), self._expected(df))
+
+    @unittest.skipIf(csv_exporter.pacsv is None, "未安装pyarrow")
+    def test_arrow_backend_nullable_columns(self):
+        """
+        测试Arrow写入器直接转换可空扩展类型和含None的object列，读回的值与to_csv一致
+        """
+        df = pd.DataFrame({
+            'geonameid': pd.array([1001, None, 1003], dtype='Int64'),
+            'name': pd.array(['California', None, 'a, "b"'], dtype='string[pyarrow]'),
+            'latitude': pd.array([1.5, None, 2.0], dtype='Float64'),
+            'admin1_code': pd.Series(['CA', None, '01'], dtype=object),
+            'population': [39_000_000, 0, 5],
+        })
+        with patch.object(CSVExporter, '_write_csv', side_effect=AssertionError("不应回退到pandas写出")):
+            self.assertTrue(self.exporter.export_states(df, backend='pyarrow'))
+
+        path = os.path.join(self.temp_dir, 'states.csv')
+        pd.testing.assert_frame_equal(pd.read_csv(path),
+                                      pd.read_csv(io.StringIO(self._expected(df))))
+
+    def test_unavailable_backend_warns(self):
+        """
+        测试请求的写出后端不可用（polars不支持压缩）时记录警告并使用pandas写出
+        """
+        with self.assertLogs('csv_exporter', level='WARNING') as logs:
+            self.assertTrue(self.exporter.export_states(self.states_df, compression='gzip', backend='polars'))
+        self.assertTrue(any('polars' in message for message in logs.output))
+
+        with gzip.open(os.path.join(self.temp_dir, 'states.csv.gz'), 'rt', encoding='utf-8', newline='') as f:
+            self.assertEqual(f.read(), self._expected(self.states_df))
+
+    @unittest.skipIf(csv_exporter.pl is None, "未安装polars")
+    def test_polars_backend_matches_to_csv(self):
+        """
+        测试polars写出的名称表与pandas的to_csv逐字节一致，数值表读回的值一致
+        """
+        state_names_df = pd.DataFrame({
+            'country_code': ['US', 'US', 'US'],
+            'name': ['California', 'Texas, "Lone Star"', None],
+            'admin1_code': ['CA', 'TX', '01'],
+            'geonameid': [1001, 1002, 1003],
+        })
+        self.assertTrue(self.exporter.export_state_names(state_names_df, backend='polars'))
+        self.assertEqual(self._read('state_names.csv'), self._expected(state_names_df))
+
+        self.assertTrue(self.exporter.export_states(self.states_df, backend='polars'))
+        pd.testing.assert_frame_equal(pd.read_csv(os.path.join(self.temp_dir, 'states.csv')),
+                                      pd.read_csv(io.StringIO(self._expected(self.states_df))))
+
+    def _export_all(self, **kwargs):
+        state_names_df = pd.DataFrame({'country_code': ['US'], 'name': ['CA'], 'admin1_code': ['CA'],
+                                       'geonameid': [1001]})
+        city_names_df = pd.DataFrame({'country_code': ['US'], 'admin1_code': ['CA'], 'state_geonameid': [1001],
+                                      'name': ['LA'], 'geonameid': [2001]})
+        csc_mapping_df = pd.DataFrame({col: [1] for col in csv_exporter._CSC_MAPPING_COLUMNS})
+        return self.exporter.export_all(self.states_df, self.states_df, state_names_df, city_names_df,
+                                        csc_mapping_df, **kwargs)
+
+    def test_validate_compressed_exports(self):
+        """
+        测试压缩导出后摘要和验证能找到带压缩扩展名的文件
+        """
+        self.assertTrue(self._export_all(compression='gzip'))
+        self.assertTrue(self.exporter.validate_exports())
+
+        summary = {item['filename']: item for item in self.exporter.get_export_summary()['files']}
+        self.assertTrue(summary['states.csv.gz']['exists'])
+        self.assertEqual(summary['states.csv.gz']['record_count'], len(self.states_df))
+
+    @unittest.skipIf(csv_exporter.pacsv is None, "未安装pyarrow")
+    def test_arrow_gzip_uses_fastest_level(self):
+        """
+        测试Arrow写入器的gzip输出使用级别1压缩
+        """
+        self.assertTrue(self.exporter.export_states(self.states_df, compression='gzip', backend='pyarrow'))
+        path = os.path.join(self.temp_dir, 'states.csv.gz')
+        with open(path, 'rb') as f:
+            # gzip头部的XFL字段：4表示最快压缩
+            self.assertEqual(f.read(9)[8], 4)
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            self.assertEqual(len(f.read().splitlines()), len(self.states_df) + 1)
+
+    def test_failed_export_leaves_no_partial_file(self):
+        """
+        测试写出失败时不残留不完整的文件
+        """
+        try:
+            import zstandard  # noqa: F401
+            self.skipTest("已安装zstandard")
+        except ImportError:
+            pass
+        self.assertFalse(self.exporter.export_state_names(
+            pd.DataFrame({'country_code': ['US'], 'name': ['CA'], 'admin1_code': ['CA'], 'geonameid': [1001]}),
+            compression='zstd'))
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir, 'state_names.csv.zst')))
+
+if __name__ == '__main__':
+    unittest.main()
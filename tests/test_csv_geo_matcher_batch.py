@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量地理匹配测试模块
+使用SQLiteIntegrator创建的小型数据库，验证match_geography_batch的匹配规则
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+# 添加src目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from csv_geo_matcher import CSVGeoMatcher
+from sqlite_integrator import SQLiteIntegrator
+
+# (geonameid, name, country_code, admin1_code, population)
+STATES = [
+    (10, 'California', 'US', '06', 1000),
+    (11, 'Texas', 'US', '48', 900),
+    (12, 'Georgia', 'US', '13', 50),
+    (13, 'Georgia', 'US', '14', 500),
+]
+
+# (geonameid, name, country_code, admin1_code, state_geonameid, population)
+CITIES = [
+    (100, 'Los Angeles', 'US', '06', 10, 1000),
+    (101, 'Austin', 'US', '48', 11, 10),
+    (102, 'Portland', 'US', '41', None, 600),
+    (103, 'Portland', 'US', '23', None, 60),
+    (104, 'Springfield', 'US', '48', 11, 5),
+    (105, 'Springfield', 'US', '48', 11, 50),
+    (106, 'Ünïcode', 'US', '06', 10, 1),
+    (107, 'Atlanta', 'US', '14', 13, 70),
+]
+
+class TestMatchGeographyBatch(unittest.TestCase):
+    """
+    批量地理匹配测试类
+    """
+
+    def setUp(self):
+        """
+        测试前的设置：创建数据库和输入CSV
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'geonames.db')
+        self.input_csv = os.path.join(self.temp_dir, 'input.csv')
+
+        integrator = SQLiteIntegrator(self.db_path)
+        integrator.create_schema()
+        conn = integrator.get_connection()
+        for geonameid, name, cc, admin1, population in STATES:
+            conn.execute("INSERT INTO states (geonameid, name, country_code, admin1_code, population) VALUES (?, ?, ?, ?, ?)",
+                         (geonameid, name, cc, admin1, population))
+            conn.execute("INSERT INTO state_names (country_code, name, admin1_code, geonameid) VALUES (?, ?, ?, ?)",
+                         (cc, name, admin1, geonameid))
+        for geonameid, name, cc, admin1, state_geonameid, population in CITIES:
+            conn.execute("INSERT INTO cities (geonameid, name, country_code, admin1_code, population) VALUES (?, ?, ?, ?, ?)",
+                         (geonameid, name, cc, admin1, population))
+            conn.execute("INSERT INTO city_names (country_code, admin1_code, state_geonameid, name, geonameid) VALUES (?, ?, ?, ?, ?)",
+                         (cc, admin1, state_geonameid, name, geonameid))
+        conn.commit()
+        conn.close()
+
+        pd.DataFrame({'country_code': ['US'], 'state_name': ['Texas'], 'city_name': ['Austin']}).to_csv(
+            self.input_csv, index=False)
+        column_mapping = {
+            'country_code': 'country_code',
+            'state_name': 'state_name',
+            'city_name': 'city_name'
+        }
+        self.matcher = CSVGeoMatcher(self.db_path, self.input_csv, os.path.join(self.temp_dir, 'output.csv'),
+                                     column_mapping, self.temp_dir)
+
+    def tearDown(self):
+        """
+        测试后的清理
+        """
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _match(self, rows):
+        """
+        对给定的(国家, 州, 城市)记录执行批量匹配，返回geonameid列表
+        """
+        df = pd.DataFrame(rows, columns=['country_code', 'state_name', 'city_name'])
+        result = self.matcher.match_geography_batch(df)
+        return [None if pd.isna(v) else int(v) for v in result['geonameid']]
+
+    def _match_single(self, rows):
+        """
+        使用逐条匹配的match_geography_single处理同样的记录，作为批量匹配的参照
+        """
+        matcher = CSVGeoMatcher(self.db_path, self.input_csv, os.path.join(self.temp_dir, 'output_single.csv'),
+                                self.matcher.column_mapping, self.temp_dir)
+        geonameids = [matcher.match_geography_single(cc, st, ci)[0] for cc, st, ci in rows]
+        return geonameids, matcher
+
+    def _assert_same_as_single(self, rows, batch_geonameids):
+        """
+        断言批量匹配的结果和统计信息与逐条匹配一致
+        """
+        geonameids, single = self._match_single(rows)
+        self.assertEqual(batch_geonameids, geonameids)
+        self.assertEqual(self.matcher.stats['successful_matches'], single.stats['successful_matches'])
+        self.assertEqual(self.matcher.stats['city_match_failures'], single.stats['city_match_failures'])
+        for key in ('state_match_details', 'city_match_details', 'data_quality_issues'):
+            self.assertEqual(self.matcher.detailed_stats[key], single.detailed_stats[key])
+
+    def test_population_priority(self):
+        """
+        测试同名州和同一州内的同名城市都选择人口最多的记录
+        """
+        rows = [
+            ('US', 'Georgia', 'Atlanta'),
+            ('US', 'Texas', 'Springfield'),
+        ]
+        geonameids = self._match(rows)
+        self.assertEqual(geonameids, [107, 105])
+        self.assertEqual(self.matcher.match_results['state_geonameid'].tolist(), [13, 11])
+        self._assert_same_as_single(rows, geonameids)
+
+    def test_country_fallback_counts_multiple_matches(self):
+        """
+        测试州内找不到城市时回退到国家范围，存在多个同名城市时计入多重匹配
+        """
+        rows = [
+            ('US', 'California', 'Portland'),
+            ('US', 'Texas', 'Los Angeles'),
+        ]
+        geonameids = self._match(rows)
+        self.assertEqual(geonameids, [102, 100])
+        city_details = self.matcher.detailed_stats['city_match_details']
+        self.assertEqual(city_details['multiple_matches'], 1)
+        self.assertEqual(city_details['exact_matches'], 1)
+        self._assert_same_as_single(rows, geonameids)
+
+    def test_nocase_folds_ascii_only(self):
+        """
+        测试大小写折叠与SQLite的COLLATE NOCASE一致，只折叠ASCII字母
+        """
+        rows = [
+            ('us', 'CALIFORNIA', 'los angeles'),
+            (' US ', ' california ', ' LOS ANGELES '),
+            ('US', 'California', 'ünïcode'),
+            ('US', 'California', 'Ünïcode'),
+        ]
+        geonameids = self._match(rows)
+        self.assertEqual(geonameids, [100, 100, None, 106])
+        self._assert_same_as_single(rows, geonameids)
+
+    def test_missing_key_values(self):
+        """
+        测试调用方传入的DataFrame在键列中包含缺失值时不报错
+        
+        国家或城市缺失的记录匹配失败；州缺失时按国家范围回退匹配城市
+        """
+        rows = [
+            ('US', 'Texas', 'Austin'),
+            (np.nan, 'Texas', 'Austin'),
+            ('US', None, 'Austin'),
+            ('US', 'Texas', np.nan),
+            ('US', 'California', 'Los Angeles'),
+        ]
+        self.assertEqual(self._match(rows), [101, None, 101, None, 100])
+        self.assertEqual(self.matcher.stats['successful_matches'], 3)
+        self.assertEqual(len(self.matcher.failed_records), 2)
+
+    def test_passthrough_columns_kept_as_text(self):
+        """
+        测试日期/时间等非键列按原始文本读取和导出，不被解析器改写
+        """
+        pd.DataFrame({
+            'country_code': ['US', 'US'],
+            'state_name': ['Texas', 'California'],
+            'city_name': ['Austin', 'Los Angeles'],
+            'created': ['2024-01-01T10:00:00', '2024-02-03T04:05:06'],
+            'day': ['2024-01-01', '2024-02-03'],
+        }).to_csv(self.input_csv, index=False)
+
+        df = self.matcher.load_csv_data()
+        self.assertEqual(df['created'].tolist(), ['2024-01-01T10:00:00', '2024-02-03T04:05:06'])
+        self.assertEqual(df['day'].tolist(), ['2024-01-01', '2024-02-03'])
+
+        output_file = self.matcher.save_results(self.matcher.match_geography_batch())
+        with open(output_file, encoding='utf-8') as f:
+            content = f.read()
+        self.assertIn('"2024-01-01T10:00:00"', content)
+        self.assertIn('"2024-02-03"', content)
+
+    def test_prepare_export_cleans_derived_frames(self):
+        """
+        测试由已准备导出的数据派生出的新DataFrame仍会被重新清理
+        """
+        prepared = self.matcher._prepare_export_data(pd.DataFrame({'note': ['a\tb'], 'geonameid': [101]}))
+        self.assertEqual(prepared['note'].tolist(), ['a b'])
+
+        derived = prepared.assign(note=['c\nd'])
+        self.assertEqual(self.matcher._prepare_export_data(derived)['note'].tolist(), ['c d'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+重复检查器测试模块
+使用SQLiteIntegrator创建的小型数据库，验证重复项明细和统计数值
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import pandas as pd
+from unittest.mock import patch
+
+# 添加src目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from duplicate_checker import DuplicateChecker
+from sqlite_integrator import SQLiteIntegrator
+
+# (country_code, name, admin1_code, geonameid)
+STATE_NAMES = [
+    ('US', 'Georgia', '13', 1),
+    ('US', 'georgia', '14', 2),   # 与上一行只有大小写不同，NOCASE下为重复
+    ('US', 'Texas', '48', 3),
+    ('us', 'TEXAS', '48', 3),
+    ('US', 'Texas', '48', 3),
+    ('US', 'Ohio', '39', 4),
+    ('GE', 'Georgia', '00', 5),   # 国家不同，不算重复
+]
+
+# (country_code, admin1_code, state_geonameid, name, geonameid)
+CITY_NAMES = [
+    ('US', '48', 3, 'Austin', 100),
+    ('US', '48', 3, 'AUSTIN', 101),
+    ('US', '48', 3, 'Dallas', 102),
+    ('US', '48', 4, 'Austin', 103),   # 州不同，不算重复
+    ('US', '41', None, 'Portland', 104),
+    ('US', '41', None, 'portland', 105),   # state_geonameid同为NULL时归为一组
+]
+
+class TestDuplicateChecker(unittest.TestCase):
+    """
+    重复检查器测试类
+    """
+
+    def setUp(self):
+        """
+        测试前的设置：创建包含已知重复项的数据库
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'geonames.db')
+
+        integrator = SQLiteIntegrator(self.db_path)
+        integrator.create_schema()
+        conn = integrator.get_connection()
+        conn.executemany("INSERT INTO state_names (country_code, name, admin1_code, geonameid) VALUES (?, ?, ?, ?)",
+                         STATE_NAMES)
+        conn.executemany("INSERT INTO city_names (country_code, admin1_code, state_geonameid, name, geonameid) "
+                         "VALUES (?, ?, ?, ?, ?)", CITY_NAMES)
+        conn.commit()
+        conn.close()
+
+        self.checker = DuplicateChecker(self.db_path)
+
+    def tearDown(self):
+        """
+        测试后的清理
+        """
+        import shutil
+        self.checker.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    @staticmethod
+    def _groups(df, columns):
+        """
+        将重复项明细转为按小写键排序的元组列表（NOCASE分组时返回哪种大小写不确定）
+        """
+        rows = []
+        for values in df[columns + ['duplicate_count']].itertuples(index=False):
+            rows.append(tuple(v.lower() if isinstance(v, str) else (None if pd.isna(v) else int(v))
+                              for v in values))
+        return sorted(rows, key=repr)
+
+    def test_state_name_duplicates(self):
+        """
+        测试state_names重复项按NOCASE分组，并给出每组的记录数
+        """
+        state_dups = self.checker.check_state_name_duplicates()
+        self.assertEqual(self._groups(state_dups, ['country_code', 'name']),
+                         [('us', 'georgia', 2), ('us', 'texas', 3)])
+
+    def test_city_name_duplicates(self):
+        """
+        测试city_names重复项按国家、州和名称分组，NULL州归为一组
+        """
+        city_dups = self.checker.check_city_name_duplicates()
+        self.assertEqual(self._groups(city_dups, ['country_code', 'state_geonameid', 'name']),
+                         [('us', 3, 'austin', 2), ('us', None, 'portland', 2)])
+
+    def test_duplicate_statistics(self):
+        """
+        测试统计中的重复记录数为各重复组记录数之和，重复率按记录数计算
+        """
+        stats = self.checker.get_duplicate_statistics()
+
+        self.assertEqual(stats['state_names']['total_records'], 7)
+        self.assertEqual(stats['state_names']['duplicate_groups'], 2)
+        self.assertEqual(stats['state_names']['duplicate_records'], 5)
+        self.assertAlmostEqual(stats['state_names']['duplicate_rate'], 5 / 7 * 100)
+
+        self.assertEqual(stats['city_names']['total_records'], 6)
+        self.assertEqual(stats['city_names']['duplicate_groups'], 2)
+        self.assertEqual(stats['city_names']['duplicate_records'], 4)
+        self.assertAlmostEqual(stats['city_names']['duplicate_rate'], 4 / 6 * 100)
+
+    def test_statistics_from_frames_match_sql(self):
+        """
+        测试由已查询的重复项明细得出的统计与SQL聚合得出的统计一致
+        """
+        from_frames = self.checker.get_duplicate_statistics(self.checker.check_state_name_duplicates(),
+                                                            self.checker.check_city_name_duplicates())
+        self.assertEqual(self.checker.get_duplicate_statistics(), from_frames)
+
+    def test_report_reuses_given_frames(self):
+        """
+        测试传入重复项明细时报告不再重复查询
+        """
+        state_dups = self.checker.check_state_name_duplicates()
+        city_dups = self.checker.check_city_name_duplicates()
+        report_file = os.path.join(self.temp_dir, 'duplicate_report.txt')
+
+        with patch.object(self.checker, 'check_state_name_duplicates') as check_states, \
+                patch.object(self.checker, 'check_city_name_duplicates') as check_cities:
+            self.checker.generate_duplicate_report(report_file, state_dups, city_dups)
+        check_states.assert_not_called()
+        check_cities.assert_not_called()
+
+        with open(report_file, encoding='utf-8') as f:
+            report = f.read()
+        self.assertIn('重复记录数: 5', report)
+        self.assertIn('重复记录数: 4', report)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -93,34 +93,33 @@ def test_duplicate_detection():
     db_path = create_test_database_with_duplicates()
     
     try:
-        # 创建重复检查器
-        checker = DuplicateChecker(db_path)
+        # 创建重复检查器，结束后关闭数据库连接
+        with DuplicateChecker(db_path) as checker:
+            # 检查state_names重复项
+            print("\n1. 检查state_names重复项:")
+            state_dups = checker.check_state_name_duplicates()
+            print(f"发现 {len(state_dups)} 个重复组")
+            if len(state_dups) > 0:
+                print(state_dups.to_string(index=False))
         
-        # 检查state_names重复项
-        print("\n1. 检查state_names重复项:")
-        state_dups = checker.check_state_name_duplicates()
-        print(f"发现 {len(state_dups)} 个重复组")
-        if len(state_dups) > 0:
-            print(state_dups.to_string(index=False))
+            # 检查city_names重复项
+            print("\n2. 检查city_names重复项:")
+            city_dups = checker.check_city_name_duplicates()
+            print(f"发现 {len(city_dups)} 个重复组")
+            if len(city_dups) > 0:
+                print(city_dups.to_string(index=False))
         
-        # 检查city_names重复项
-        print("\n2. 检查city_names重复项:")
-        city_dups = checker.check_city_name_duplicates()
-        print(f"发现 {len(city_dups)} 个重复组")
-        if len(city_dups) > 0:
-            print(city_dups.to_string(index=False))
+            # 生成统计信息
+            print("\n3. 统计信息:")
+            stats = checker.get_duplicate_statistics()
+            print(f"State Names: {stats['state_names']['total_records']} 总记录, {stats['state_names']['duplicate_groups']} 重复组, {stats['state_names']['duplicate_rate']:.2f}% 重复率")
+            print(f"City Names: {stats['city_names']['total_records']} 总记录, {stats['city_names']['duplicate_groups']} 重复组, {stats['city_names']['duplicate_rate']:.2f}% 重复率")
         
-        # 生成统计信息
-        print("\n3. 统计信息:")
-        stats = checker.get_duplicate_statistics()
-        print(f"State Names: {stats['state_names']['total_records']} 总记录, {stats['state_names']['duplicate_groups']} 重复组, {stats['state_names']['duplicate_rate']:.2f}% 重复率")
-        print(f"City Names: {stats['city_names']['total_records']} 总记录, {stats['city_names']['duplicate_groups']} 重复组, {stats['city_names']['duplicate_rate']:.2f}% 重复率")
-        
-        # 生成详细报告
-        print("\n4. 生成详细报告...")
-        report_file = 'test_duplicate_detection_report.txt'
-        checker.generate_duplicate_report(report_file)
-        print(f"✓ 详细报告已生成: {report_file}")
+            # 生成详细报告
+            print("\n4. 生成详细报告...")
+            report_file = 'test_duplicate_detection_report.txt'
+            checker.generate_duplicate_report(report_file)
+            print(f"✓ 详细报告已生成: {report_file}")
         
         print("\n=" * 60)
         print("重复检测功能测试完成")
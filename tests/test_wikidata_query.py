@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Wikidata批量查询测试模块
+模拟单批次SPARQL查询，验证结果合并、重定向处理、失败批次处理以及并发请求数
+"""
+
+import unittest
+import os
+import sys
+import threading
+import time
+from unittest.mock import patch
+
+# 添加src目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import wikidata_query
+from wikidata_query import batch_query_geonameid
+
+ENTITY = 'http://www.wikidata.org/entity/'
+
+# 模拟的查询结果：QID -> geonameid，或重定向到另一个QID
+GEONAMEIDS = {'Q1': '101', 'Q2': '102', 'Q3': '103', 'Q10': '110', 'Q11': '111'}
+REDIRECTS = {'Q4': 'Q10', 'Q5': 'Q11'}
+
+# 查询耗时较长的ID，用于让重定向在其他批次仍在查询时出现
+SLOW_IDS = {'Q1', 'Q2', 'Q3'}
+
+class TestBatchQueryGeonameid(unittest.TestCase):
+    """
+    批量查询geonameid测试类
+    """
+
+    def setUp(self):
+        """
+        测试前的设置：记录模拟查询的调用与并发情况
+        """
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def _fake_query(self, batch_ids, fail_ids=()):
+        """
+        模拟单批次查询，返回与SPARQL查询相同格式的结果行
+        """
+        with self.lock:
+            self.calls.append(list(batch_ids))
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            # 让各批次的查询时间重叠，便于统计并发数
+            time.sleep(0.2 if SLOW_IDS.intersection(batch_ids) else 0.02)
+            if any(qid in fail_ids for qid in batch_ids):
+                raise RuntimeError("查询失败")
+            results = []
+            for qid in batch_ids:
+                if qid in GEONAMEIDS:
+                    results.append({'item': ENTITY + qid, 'geonameid': GEONAMEIDS[qid]})
+                elif qid in REDIRECTS:
+                    results.append({'item': ENTITY + qid, 'redirected': ENTITY + REDIRECTS[qid]})
+                else:
+                    results.append({'item': ENTITY + qid})
+            return results
+        finally:
+            with self.lock:
+                self.active -= 1
+
+    def _query(self, ids, fail_ids=(), **kwargs):
+        """
+        使用模拟查询执行批量查询（不启用缓存）
+        """
+        with patch.object(wikidata_query, '_query_geonameid_batch',
+                          side_effect=lambda batch_ids: self._fake_query(batch_ids, fail_ids)):
+            return batch_query_geonameid(ids, enable_cache=False, **kwargs)
+
+    def test_merges_batch_results(self):
+        """
+        测试多个批次的结果合并，未找到geonameid的ID不出现在结果中
+        """
+        result = self._query(['Q1', 'Q2', 'Q3', 'Q99'], batch_size=2, max_workers=2)
+
+        self.assertEqual(result, {'Q1': '101', 'Q2': '102', 'Q3': '103'})
+        self.assertEqual(sorted(map(tuple, self.calls)), [('Q1', 'Q2'), ('Q3', 'Q99')])
+
+    def test_redirects_resolved_once(self):
+        """
+        测试各批次的重定向ID汇总后只递归查询一次，原ID和新ID都映射到geonameid
+        """
+        result = self._query(['Q1', 'Q4', 'Q5'], batch_size=1, max_workers=2)
+
+        self.assertEqual(result, {'Q1': '101', 'Q4': '110', 'Q10': '110', 'Q5': '111', 'Q11': '111'})
+        # 3个原始批次 + 重定向的2个批次
+        self.assertEqual(len(self.calls), 5)
+        self.assertEqual(sorted(map(tuple, self.calls[3:])), [('Q10',), ('Q11',)])
+
+    def test_concurrency_limited_by_max_workers(self):
+        """
+        测试处理重定向时同时进行的查询数不超过max_workers
+        
+        重定向批次先返回，其他批次仍在查询中
+        """
+        self._query(['Q4', 'Q5', 'Q1', 'Q2', 'Q3'], batch_size=1, max_workers=2)
+
+        self.assertLessEqual(self.max_active, 2)
+
+    def test_failed_batch(self):
+        """
+        测试某个批次查询出错时只丢弃该批次，其余批次的结果和重定向照常处理
+        """
+        result = self._query(['Q1', 'Q2', 'Q4'], fail_ids=('Q2',), batch_size=1, max_workers=2)
+
+        self.assertEqual(result, {'Q1': '101', 'Q4': '110', 'Q10': '110'})
+
+if __name__ == '__main__':
+    unittest.main()